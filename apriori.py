@@ -70,17 +70,23 @@ def count_itemset_support(transactions : List[ Set[ str ] ],
 
     """Given a list of transactions and an itemset, find the support count of this itemset."""
 
+    # weighted transactions store their integer count in front [ count, item1, item2, ... ]
+    weighted = isinstance(transactions[0][0], int)
+
     # empty itemset
     if (len(itemset) == 0):
 
         # number of transactions
-        return len(transactions)
+        return (sum(transaction[0] for transaction in transactions) if (weighted) else len(transactions))
 
-    # number of transactions that are supersets of itemset
-    return len(set_intersection(*[  
+    # transactions that are supersets of itemset
+    tids = set_intersection(*[  
         occurrences[item][1] 
             for item in itemset  
-    ]))
+    ])
+
+    # total count of weighted transactions, otherwise the number of transactions
+    return (sum(transactions[tid][0] for tid in tids) if (weighted) else len(tids))
 
 
 
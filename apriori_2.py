@@ -1,21 +1,6 @@
 from typing import *
-
-def argmin(iterable : Iterable, key_funct : Optional[ Callable ] = lambda x : x[1]) -> Tuple[ int, Any ]:
-    
-    """This function take an iterable and returns the minimum element and its index."""
-    return min(enumerate(iterable), key = key_funct)
-
-
-def set_intersection(*sets_list) -> Set[ Any ]:
-
-    """This function finds the intersection between a list of sets."""
-
-    # index of minimum set
-    min_idx : int = argmin(sets_list, lambda x : len(x[1]))[0]
-
-    # the intersection of these sets
-    return set.intersection(sets_list[min_idx], *sets_list[None : min_idx], *sets_list[min_idx + 1 : None])
-
+from support_counting import BitmapDatabase, CandidateTrie, PartitionedCounter, np
+from transaction_store import TransactionStore
 
 def count_item_occurrences(transactions : List[ List[ Union[ int, str ] ] ]
             ) -> Dict[ str, List[ Union[ int, Set[ int ] ] ] ]:
@@ -63,64 +48,100 @@ def count_item_occurrences(transactions : List[ List[ Union[ int, str ] ] ]
 
 
 
-def count_itemset_support(transactions : List[ Set[ str ] ], 
-                          occurrences  : Dict[ str, List[ Union[ int, Set[ str ] ] ] ],
-                          itemset      : Set[ str ]
-            ) -> int:
+def format_transactions(transactions : List[ List[ Union[ int, str ] ] ]) -> List[ Tuple[ int, Set[ Union[ int, str ] ] ] ]:
 
-    """Given a list of transactions and an itemset, find the support count of this itemset."""
+    """Convert transactions into (count, item set) pairs, taking the integer count stored in front of weighted transactions."""
 
-    count = 0
+    return [  
+        ((transaction[0], set(transaction[1:])) if (transaction.__len__() and isinstance(transaction[0], int)) else (1, set(transaction)))
+            for transaction in transactions  
+    ]
 
-    for transaction in transactions:
 
-        count += itemset.issubset(transaction)
-    
-    return count
+def count_candidate_supports(transactions    : List[ Tuple[ int, Set[ str ] ] ], 
+                             candidates      : List[ List[ str ] ],
+                             bitmap_database : Optional[ BitmapDatabase ] = None,
+                             support_counter : Optional[ PartitionedCounter ] = None) -> List[ int ]:
 
-    # empty itemset
-    if (len(itemset) == 0):
+    """
+        Given a level of candidates, find the support count of each candidate, either by count distribution
+        over worker partitions, all at once with a bitmap database or with a single scan of the transactions
+        through a candidate prefix trie.
+    """
 
-        # number of transactions
-        return len(transactions)
+    if (support_counter is not None):
+        return support_counter.count_supports(candidates)
 
-    # number of transactions that are supersets of itemset
-    return len(set_intersection(*[  
-        occurrences[item][1] 
-            for item in itemset  
-    ]))
+    if (bitmap_database is not None):
+        return bitmap_database.count_supports(candidates)
 
+    return CandidateTrie(candidates).count_supports(transactions)
 
-def generate_candidates(transactions : List[ List[ str ] ], 
-                        occurrences  : Dict[ str, List[ Union[ int, Set[ str ] ] ] ], 
-                        itemset_k    : List[ List[ Union[ List[ str ], int ] ] ],
-                        min_sup_int  : int) -> List[ Set[ str ] ]:
+
+def generate_candidates(transactions     : List[ List[ str ] ], 
+                        itemset_k        : List[ List[ Union[ List[ str ], int ] ] ],
+                        min_sup_int      : int,
+                        bitmap_database  : Optional[ BitmapDatabase ] = None,
+                        level_statistics : Optional[ List[ Dict[ str, int ] ] ] = None,
+                        support_counter  : Optional[ PartitionedCounter ] = None) -> List[ Set[ str ] ]:
     
-    num_items = len(itemset_k)
+    k_1 = len(itemset_k[0][0])
+
+    # hashed index of frequent k-itemsets
+    frequent_k = set(frozenset(itemset) for itemset, _ in itemset_k)
+
+    # frequent k-itemsets grouped by their first (k - 1) items {  prefix : [ last_item, ... ]  }
+    prefix_groups = dict()
+
+    for itemset, _ in itemset_k:
+        prefix_groups.setdefault(tuple(itemset[:-1]), []).append(itemset[-1])
 
     candidates = []
 
-    k_1 = len(itemset_k[0][0])
+    (num_generated, num_pruned) = (0, 0)
 
-    for i in range(num_items - 1):
+    # join itemsets sharing the same first (k - 1) items
+    for prefix, last_items in prefix_groups.items():
 
-        for j in range(i + 1, num_items):
+        for i in range(len(last_items) - 1):
 
-            if (k_1 > 1):
+            for j in range(i + 1, len(last_items)):
+
+                candidate = [ *prefix, last_items[i], last_items[j] ]
+
+                num_generated += 1
+
+                # downward closure: every k-subset must be frequent (the two joined itemsets already are)
+                if any((frozenset(candidate[:idx] + candidate[idx + 1:]) not in frequent_k) for idx in range(k_1 - 1)):
+
+                    num_pruned += 1
 
-                if any((itemset_k[i][0][idx] != itemset_k[j][0][idx]) for idx in range(k_1 - 1)):
                     continue
 
-            candidate = itemset_k[i][0] + [ itemset_k[j][0][-1] ]
+                candidates.append(candidate)
 
-            candidate_support = count_itemset_support(transactions, occurrences, set(candidate))
+    # count the whole level at once with packed bitmaps whenever NumPy is available
+    if ((bitmap_database is None) and (support_counter is None) and (np is not None)):
+        bitmap_database = BitmapDatabase(transactions)
 
-            if (candidate_support < min_sup_int):
-                continue
+    candidate_supports = count_candidate_supports(transactions, candidates, bitmap_database, support_counter)
 
-            candidates.append([ candidate.copy(), candidate_support ])
+    frequent_candidates = [
+        [ candidate, candidate_support ] for candidate, candidate_support in zip(candidates, candidate_supports)
+            if (candidate_support >= min_sup_int)
+    ]
+
+    # number of candidates generated by join, pruned by downward closure and counted against transactions
+    if (level_statistics is not None):
+        level_statistics.append({
+            "level"     : k_1 + 1,
+            "generated" : num_generated,
+            "pruned"    : num_pruned,
+            "counted"   : candidates.__len__(),
+            "frequent"  : frequent_candidates.__len__()
+        })
 
-    return candidates
+    return frequent_candidates
 
 
 def format_frequent_patterns(frequent_patterns : List[ Tuple[ FrozenSet[ str ], int ] ]):
@@ -141,12 +162,28 @@ def format_occurrences(occurrences : Dict[ str, List[ Union[ int, Set[ str ] ] ]
     return occurrences
 
 
-def mine_frequent_patterns(transactions : List[ List[ str ] ], 
-                           min_sup_int  : int
+def mine_frequent_patterns(transactions     : List[ List[ str ] ], 
+                           min_sup_int      : int,
+                           level_statistics : Optional[ List[ Dict[ str, int ] ] ] = None,
+                           num_workers      : Optional[ int ] = None
             ) -> Tuple[ Dict[ FrozenSet[ str ], int ], Dict[ str, int ] ]:
+
+    """
+        Mines frequent patterns level by level. If `level_statistics` is given, a dictionary with the number of
+        candidates generated, pruned, counted and found frequent is appended to it for every level. With
+        `num_workers` greater than 1, candidates are counted by count distribution: the transactions are put in a
+        shared-memory store, each worker process counts over its own tid range of it for the whole run and the
+        local counts of every level are summed.
+    """
     
     occurrences = count_item_occurrences(transactions)
 
+    # shared-memory transactions read in place by the counting workers
+    store = ((TransactionStore(transactions)) if (num_workers is not None and num_workers > 1) else (None))
+
+    # (count, item set) pairs, so that encoded items are never mistaken for counts
+    transactions = format_transactions(transactions)
+
     frequent_patterns = [
         [[ item ], count_data[0]] for item, count_data in occurrences.items()
             if (count_data[0] >= min_sup_int)
@@ -154,16 +191,34 @@ def mine_frequent_patterns(transactions : List[ List[ str ] ],
 
     itemset_k = frequent_patterns.copy()
 
-    while (itemset_k):
+    # persistent workers, each counting candidates over its own partition of the store
+    support_counter = ((PartitionedCounter(store, num_workers)) if (store is not None) else (None))
+
+    # packed bitmaps built once for all levels (requires NumPy)
+    bitmap_database = ((BitmapDatabase(transactions)) if (np is not None and support_counter is None) else (None))
+
+    try:
+
+        while (itemset_k):
+
+            itemset_k = generate_candidates(
+                transactions, 
+                itemset_k, 
+                min_sup_int,
+                bitmap_database,
+                level_statistics,
+                support_counter
+            )
+
+            frequent_patterns += itemset_k
+
+    finally:
 
-        itemset_k = generate_candidates(
-            transactions, 
-            occurrences, 
-            itemset_k, 
-            min_sup_int
-        )
+        if (support_counter is not None):
+            support_counter.close()
 
-        frequent_patterns += itemset_k
+        if (store is not None):
+            store.close()
 
     format_occurrences(occurrences)
 
@@ -1,23 +1,7 @@
 from typing import *
+from support_counting import BitmapDatabase, CandidateTrie, np
 import copy
 
-def argmin(iterable : Iterable, key_funct : Optional[ Callable ] = lambda x : x[1]) -> Tuple[ int, Any ]:
-    
-    """This function take an iterable and returns the minimum element and its index."""
-    return min(enumerate(iterable), key = key_funct)
-
-
-def set_intersection(*sets_list) -> Set[ Any ]:
-
-    """This function finds the intersection between a list of sets."""
-
-    # index of minimum set
-    min_idx : int = argmin(sets_list, lambda x : len(x[1]))[0]
-
-    # the intersection of these sets
-    return set.intersection(sets_list[min_idx], *sets_list[None : min_idx], *sets_list[min_idx + 1 : None])
-
-
 def count_item_occurrences(transactions : List[ List[ Union[ int, str ] ] ]
             ) -> Dict[ str, List[ Union[ int, Set[ int ] ] ] ]:
 
@@ -64,72 +48,108 @@ def count_item_occurrences(transactions : List[ List[ Union[ int, str ] ] ]
 
 
 
-def count_itemset_support(transactions : List[ Set[ str ] ], 
-                          occurrences  : Dict[ str, List[ Union[ int, Set[ str ] ] ] ],
-                          itemset      : Set[ str ]
-            ) -> int:
+def format_transactions(transactions : List[ List[ Union[ int, str ] ] ]) -> List[ Tuple[ int, Set[ Union[ int, str ] ] ] ]:
 
-    """Given a list of transactions and an itemset, find the support count of this itemset."""
+    """Convert transactions into (count, item set) pairs, taking the integer count stored in front of weighted transactions."""
 
-    count = 0
+    return [  
+        ((transaction[0], set(transaction[1:])) if (transaction.__len__() and isinstance(transaction[0], int)) else (1, set(transaction)))
+            for transaction in transactions  
+    ]
 
-    for transaction in transactions:
 
-        count += itemset.issubset(transaction)
-    
-    return count
+def count_candidate_supports(transactions    : List[ Tuple[ int, Set[ str ] ] ], 
+                             candidates      : List[ Set[ str ] ],
+                             bitmap_database : Optional[ BitmapDatabase ] = None) -> List[ int ]:
 
-    # empty itemset
-    if (len(itemset) == 0):
+    """
+        Given a level of candidates, find the support count of each candidate, either all at once with a 
+        bitmap database or with a single scan of the transactions through a candidate prefix trie.
+    """
 
-        # number of transactions
-        return len(transactions)
+    if (bitmap_database is not None):
+        return bitmap_database.count_supports(candidates)
 
-    # number of transactions that are supersets of itemset
-    return len(set_intersection(*[  
-        occurrences[item][1] 
-            for item in itemset  
-    ]))
+    return CandidateTrie(candidates).count_supports(transactions)
 
 
-def generate_candidates(transactions : List[ List[ str ] ], 
-                        occurrences  : Dict[ str, List[ Union[ int, Set[ str ] ] ] ], 
-                        itemset_k    : Dict[ FrozenSet[ str ], Dict[ str, int ] ],
-                        min_sup_int  : int) -> List[ Set[ str ] ]:
+def generate_candidates(transactions     : List[ List[ str ] ], 
+                        itemset_k        : Dict[ FrozenSet[ str ], Dict[ str, int ] ],
+                        min_sup_int      : int,
+                        bitmap_database  : Optional[ BitmapDatabase ] = None,
+                        level_statistics : Optional[ List[ Dict[ str, int ] ] ] = None) -> List[ Set[ str ] ]:
     
-    candidates = dict()
+    # hashed index of frequent k-itemsets
+    frequent_k = set(
+        prefix.union({ item_label }) for prefix, suffix_data in itemset_k.items() for item_label in suffix_data
+    )
+
+    # joined candidates [ (new_prefix, new_item_label, new_item_set) ]
+    joined = []
+
+    (num_generated, num_pruned) = (0, 0)
 
     for prefix, suffix_data in itemset_k.items():
 
-        for item_label, item_support in suffix_data.items():
+        item_labels = list(suffix_data.keys())
 
-            for (other_item_label, other_item_support) in itemset_k[prefix].items():
+        # each pair of suffixes is joined once
+        for i in range(item_labels.__len__() - 1):
 
-                if (item_label == other_item_label):
-                    continue
+            for j in range(i + 1, item_labels.__len__()):
+
+                (item_label, other_item_label) = (item_labels[i], item_labels[j])
 
                 if (item_label < other_item_label):
-                    new_prefix = { item_label }.union(prefix)
+                    new_prefix = prefix.union({ item_label })
                     new_item_label = other_item_label
 
                 else:
-                    new_prefix = { other_item_label }.union(prefix)
+                    new_prefix = prefix.union({ other_item_label })
                     new_item_label = item_label
 
                 new_item_set = new_prefix.union({ new_item_label })
 
-                new_support = count_itemset_support(transactions, occurrences, new_item_set)
+                num_generated += 1
+
+                # downward closure: every k-subset must be frequent (those without a joined item already are)
+                if any((new_item_set.difference({ item }) not in frequent_k) for item in prefix):
+
+                    num_pruned += 1
 
-                if (new_support < min_sup_int):
                     continue
 
-                fs_new_prefix = frozenset(new_prefix)
+                joined.append((new_prefix, new_item_label, new_item_set))
 
-                if (fs_new_prefix in candidates):
-                    candidates[fs_new_prefix][new_item_label] = new_support
+    # count the whole level at once with packed bitmaps whenever NumPy is available
+    if ((bitmap_database is None) and (np is not None)):
+        bitmap_database = BitmapDatabase(transactions)
 
-                else:
-                    candidates[fs_new_prefix] = { new_item_label : new_support }
+    new_supports = count_candidate_supports(transactions, [  x[2] for x in joined  ], bitmap_database)
+
+    candidates = dict()
+
+    for (fs_new_prefix, new_item_label, _), new_support in zip(joined, new_supports):
+
+        if (new_support < min_sup_int):
+            continue
+
+        if (fs_new_prefix in candidates):
+            candidates[fs_new_prefix][new_item_label] = new_support
+
+        else:
+            candidates[fs_new_prefix] = { new_item_label : new_support }
+
+    # number of candidates generated by join, pruned by downward closure and counted against transactions
+    # (prefixes of k-itemsets hold k - 1 items, even when no k-itemset is frequent)
+    if (level_statistics is not None):
+        level_statistics.append({
+            "level"     : next(iter(itemset_k)).__len__() + 2,
+            "generated" : num_generated,
+            "pruned"    : num_pruned,
+            "counted"   : joined.__len__(),
+            "frequent"  : sum(map(len, candidates.values()))
+        })
 
     return candidates
 
@@ -153,12 +173,21 @@ def format_occurrences(occurrences : Dict[ str, List[ Union[ int, Set[ str ] ] ]
     return occurrences
 
 
-def mine_frequent_patterns(transactions : List[ List[ str ] ], 
-                           min_sup_int  : int
+def mine_frequent_patterns(transactions     : List[ List[ str ] ], 
+                           min_sup_int      : int,
+                           level_statistics : Optional[ List[ Dict[ str, int ] ] ] = None
             ) -> Tuple[ Dict[ FrozenSet[ str ], int ], Dict[ str, int ] ]:
+
+    """
+        Mines frequent patterns level by level. If `level_statistics` is given, a dictionary with the number of
+        candidates generated, pruned, counted and found frequent is appended to it for every level.
+    """
     
     occurrences = count_item_occurrences(transactions)
 
+    # (count, item set) pairs, so that encoded items are never mistaken for counts
+    transactions = format_transactions(transactions)
+
     frequent_patterns = {
         frozenset({}) : {
             item : count_data[0] 
@@ -169,13 +198,17 @@ def mine_frequent_patterns(transactions : List[ List[ str ] ],
 
     itemset_k = copy.deepcopy(frequent_patterns)
 
+    # packed bitmaps built once for all levels (requires NumPy)
+    bitmap_database = ((BitmapDatabase(transactions)) if (np is not None) else (None))
+
     while (itemset_k.__len__()):
 
         itemset_k = generate_candidates(
             transactions, 
-            occurrences, 
             itemset_k, 
-            min_sup_int
+            min_sup_int,
+            bitmap_database,
+            level_statistics
         )
 
         frequent_patterns.update(itemset_k)
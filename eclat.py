@@ -0,0 +1,516 @@
+from typing import *
+import heapq
+
+def build_vertical_database(transactions : List[ List[ Union[ int, str ] ] ]
+            ) -> Tuple[ Dict[ Union[ int, str ], int ], Dict[ int, int ], Dict[ Union[ int, str ], int ] ]:
+
+    """
+        Given a list of transactions, build the vertical database: a tidset (big-int bitset where bit `tid`
+        is set) for each distinct item, a bitset of transactions for each bit of the transaction counts
+        {  2 ** b : transactions whose count has bit b set  } and the occurrences of each item.
+    """
+
+    # number of bytes needed to hold one bit per transaction
+    num_bytes = (transactions.__len__() + 7) // 8
+
+    # tidset of each item as a mutable byte buffer (converted to integers once filled)
+    item_buffers = dict()
+
+    # bitset of transactions for each bit (bit plane) of the transaction counts
+    weight_buffers = dict()
+
+    # initialize empty dictionary to record item occurrences
+    occurrences = dict()
+
+    for tid, transaction in enumerate(transactions):
+
+        # define incremental base unit (default 1)
+        occur_incr_unit = 1
+
+        # integer count is stored in front of transaction
+        if (transaction.__len__() and isinstance(transaction[0], int)):
+
+            # override incremental base unit
+            occur_incr_unit = transaction[0]
+
+            # ignore first element since it is not an item
+            transaction = transaction[1:]
+
+        (byte_index, bit_mask) = (tid >> 3, 1 << (tid & 7))
+
+        # add transaction to the bit plane of each set bit of its count
+        remaining_weight = occur_incr_unit
+
+        while (remaining_weight):
+
+            # lowest set bit of the count
+            bit_weight = remaining_weight & -remaining_weight
+
+            if (bit_weight not in weight_buffers):
+                weight_buffers[bit_weight] = bytearray(num_bytes)
+
+            weight_buffers[bit_weight][byte_index] |= bit_mask
+
+            remaining_weight ^= bit_weight
+
+        for item in transaction:
+
+            if (item not in item_buffers):
+                item_buffers[item] = bytearray(num_bytes)
+
+            # an item repeated within a transaction still belongs to it only once
+            if (item_buffers[item][byte_index] & bit_mask):
+                continue
+
+            item_buffers[item][byte_index] |= bit_mask
+
+            occurrences[item] = occurrences.get(item, 0) + occur_incr_unit
+
+    tidsets      = {  item   : int.from_bytes(buffer, "little") for item, buffer in item_buffers.items()  }
+
+    weight_masks = {  weight : int.from_bytes(buffer, "little") for weight, buffer in weight_buffers.items()  }
+
+    return (tidsets, weight_masks, occurrences)
+
+
+
+def count_bitset_support(bitset : int, weight_masks : Dict[ int, int ]) -> int:
+
+    """
+        Given a bitset of transactions, find its support count (the total count of its transactions),
+        with one AND and popcount per bit plane of the transaction counts.
+    """
+
+    # all transactions share the same count (a single bit plane holds every transaction)
+    if (weight_masks.__len__() == 1):
+
+        for weight in weight_masks:
+            return (weight * bitset.bit_count())
+
+    return sum(
+        weight * (bitset & weight_mask).bit_count()
+            for weight, weight_mask in weight_masks.items()
+    )
+
+
+
+def __mine_tidsets(frequent_patterns : Dict[ FrozenSet[ Any ], int ],
+                   prefix            : List[ Any ],
+                   extensions        : List[ Tuple[ Any, int, int ] ],
+                   weight_masks      : Dict[ int, int ],
+                   min_sup_int       : int
+            ) -> None:
+
+    """This function is called to recursively mine an equivalence class of (item, tidset, support) extensions of `prefix`."""
+
+    for idx, (item, tidset, support) in enumerate(extensions):
+
+        # add item to prefix
+        prefix.append(item)
+
+        # save frequent itemset with its corresponding support count
+        frequent_patterns[frozenset(prefix)] = support
+
+        # extensions of the new prefix, each costing a single intersection with the carried-down tidset
+        children = []
+
+        for (other_item, other_tidset, _) in extensions[idx + 1 : None]:
+
+            child_tidset  = tidset & other_tidset
+
+            child_support = count_bitset_support(child_tidset, weight_masks)
+
+            if (child_support >= min_sup_int):
+                children.append((other_item, child_tidset, child_support))
+
+        if (children.__len__()):
+            __mine_tidsets(frequent_patterns, prefix, children, weight_masks, min_sup_int)
+
+        # undo addition of item
+        prefix.pop()
+
+
+
+def __mine_diffsets(frequent_patterns : Dict[ FrozenSet[ Any ], int ],
+                    prefix            : List[ Any ],
+                    extensions        : List[ Tuple[ Any, int, int ] ],
+                    weight_masks      : Dict[ int, int ],
+                    min_sup_int       : int
+            ) -> None:
+
+    """
+        This function is called to recursively mine an equivalence class of (item, diffset, support) extensions
+        of `prefix`, where the diffset of item X holds the transactions of `prefix` that do not contain X.
+    """
+
+    for idx, (item, diffset, support) in enumerate(extensions):
+
+        # add item to prefix
+        prefix.append(item)
+
+        # save frequent itemset with its corresponding support count
+        frequent_patterns[frozenset(prefix)] = support
+
+        children = []
+
+        for (other_item, other_diffset, _) in extensions[idx + 1 : None]:
+
+            # d(PXY) = d(PY) - d(PX)
+            child_diffset = other_diffset & ~diffset
+
+            # sup(PXY) = sup(PX) - |d(PXY)|
+            child_support = support - count_bitset_support(child_diffset, weight_masks)
+
+            if (child_support >= min_sup_int):
+                children.append((other_item, child_diffset, child_support))
+
+        if (children.__len__()):
+            __mine_diffsets(frequent_patterns, prefix, children, weight_masks, min_sup_int)
+
+        # undo addition of item
+        prefix.pop()
+
+
+
+def find_frequent_patterns(tidsets      : Dict[ Any, int ],
+                           weight_masks : Dict[ int, int ],
+                           occurrences  : Dict[ Any, int ],
+                           min_sup_int  : int,
+                           diffsets     : Optional[ bool ] = None
+            ) -> Dict[ FrozenSet[ Any ], int ]:
+
+    """
+        Given the vertical database, find frequent patterns with their corresponding support counts using
+        Eclat (tidsets) or dEclat (diffsets). By default diffsets are used on dense data, i.e. when frequent
+        items occur in at least half of the transactions on average.
+    """
+
+    # initialize dictionary to store frequent patterns with their support counts
+    frequent_patterns = dict()
+
+    # frequent items in non-decreasing order by occurrences (keeps intersections small)
+    frequent_items = sorted(
+        filter(lambda x : occurrences[x] >= min_sup_int, occurrences), key = lambda x : (occurrences[x], x)
+    )
+
+    if (frequent_items.__len__() == 0):
+        return frequent_patterns
+
+    if (diffsets is None):
+
+        # total count of all transactions
+        num_transactions = sum(weight * weight_mask.bit_count() for weight, weight_mask in weight_masks.items())
+
+        diffsets = (sum(map(occurrences.__getitem__, frequent_items)) >= 0.5 * num_transactions * frequent_items.__len__())
+
+    extensions = [  (item, tidsets[item], occurrences[item]) for item in frequent_items  ]
+
+    if (not diffsets):
+
+        __mine_tidsets(frequent_patterns, [], extensions, weight_masks, min_sup_int)
+
+        return frequent_patterns
+
+    """
+        dEclat: switch from tidsets to diffsets from the second level on, d(XY) = t(X) - t(Y)
+    """
+
+    for idx, (item, tidset, support) in enumerate(extensions):
+
+        frequent_patterns[frozenset([ item ])] = support
+
+        children = []
+
+        for (other_item, other_tidset, _) in extensions[idx + 1 : None]:
+
+            child_diffset = tidset & ~other_tidset
+
+            child_support = support - count_bitset_support(child_diffset, weight_masks)
+
+            if (child_support >= min_sup_int):
+                children.append((other_item, child_diffset, child_support))
+
+        if (children.__len__()):
+            __mine_diffsets(frequent_patterns, [ item ], children, weight_masks, min_sup_int)
+
+    return frequent_patterns
+
+
+
+def __charm_extend(closed_patterns : Dict[ int, Set[ Any ] ],
+                   prefix          : FrozenSet[ Any ],
+                   nodes           : List[ List[ Any ] ],
+                   weight_masks    : Dict[ int, int ],
+                   min_sup_int     : int
+            ) -> None:
+
+    """
+        CHARM: recursively extends a class of [ items, tidset, support ] nodes of `prefix`, in non-decreasing order by
+        support. Node j is merged into node i when its tidset contains that of i (both have the same closure then),
+        removed when both tidsets are equal or it is contained in i, and otherwise joined into the class of i.
+    """
+
+    for idx, node in enumerate(nodes):
+
+        # removed by an earlier node of the class
+        if (node is None):
+            continue
+
+        (items, tidset, support) = node
+
+        children = []
+
+        for other_idx in range(idx + 1, nodes.__len__()):
+
+            if (nodes[other_idx] is None):
+                continue
+
+            (other_items, other_tidset, _) = nodes[other_idx]
+
+            child_tidset = tidset & other_tidset
+
+            # t(Xi) = t(Xj) => same closure, Xj is covered by Xi
+            if (child_tidset == tidset and child_tidset == other_tidset):
+
+                items |= other_items
+
+                nodes[other_idx] = None
+
+            # t(Xi) within t(Xj) => Xj is in the closure of Xi
+            elif (child_tidset == tidset):
+                items |= other_items
+
+            # t(Xj) within t(Xi) => Xj only occurs along with XiXj
+            elif (child_tidset == other_tidset):
+
+                nodes[other_idx] = None
+
+                children.append([ set(other_items), child_tidset, count_bitset_support(child_tidset, weight_masks) ])
+
+            else:
+
+                child_support = count_bitset_support(child_tidset, weight_masks)
+
+                if (child_support >= min_sup_int):
+                    children.append([ set(other_items), child_tidset, child_support ])
+
+        # prefix of the children, with every item merged into node i
+        itemset = prefix.union(items)
+
+        if (children.__len__()):
+
+            children.sort(key = lambda x : x[2])
+
+            __charm_extend(closed_patterns, itemset, children, weight_masks, min_sup_int)
+
+        # itemsets sharing a tidset share their closure, which holds all of them
+        closed_patterns[tidset] = closed_patterns.get(tidset, set()).union(itemset)
+
+
+
+def find_closed_patterns(tidsets      : Dict[ Any, int ],
+                         weight_masks : Dict[ int, int ],
+                         occurrences  : Dict[ Any, int ],
+                         min_sup_int  : int
+            ) -> Dict[ FrozenSet[ Any ], int ]:
+
+    """
+        Given the vertical database, find the closed frequent patterns (frequent itemsets without a superset of the
+        same support) with their support counts using CHARM. Every frequent itemset and its support can be derived
+        from them (see `derive_support`).
+    """
+
+    # frequent items in non-decreasing order by occurrences
+    frequent_items = sorted(
+        filter(lambda x : occurrences[x] >= min_sup_int, occurrences), key = lambda x : (occurrences[x], x)
+    )
+
+    # closure of each closed tidset {  tidset : {  item, ...  }  }
+    closed_patterns = dict()
+
+    __charm_extend(closed_patterns, frozenset(), [  [ {  item  }, tidsets[item], occurrences[item] ] for item in frequent_items  ], weight_masks, min_sup_int)
+
+    return {  frozenset(itemset) : count_bitset_support(tidset, weight_masks) for tidset, itemset in closed_patterns.items()  }
+
+
+
+def derive_support(itemset : Iterable[ Any ], closed_patterns : Dict[ FrozenSet[ Any ], int ]) -> int:
+
+    """Support count of any itemset from the closed patterns: that of its largest-support closed superset (0 if infrequent)."""
+
+    itemset = frozenset(itemset)
+
+    return max((support for closed_itemset, support in closed_patterns.items() if (itemset <= closed_itemset)), default = 0)
+
+
+
+def find_top_k_patterns(tidsets      : Dict[ Any, int ],
+                        weight_masks : Dict[ int, int ],
+                        occurrences  : Dict[ Any, int ],
+                        k            : int,
+                        min_length   : int = 1
+            ) -> Dict[ FrozenSet[ Any ], int ]:
+
+    """
+        Given the vertical database, find the k most frequent patterns of at least `min_length` items without a support
+        threshold (patterns tied with the k-th support are all kept). Itemsets are expanded best-first, highest support
+        first, and the border (k-th highest support seen so far) rises as itemsets are found, pruning every extension
+        below it. Since extensions never have a higher support than their prefix, itemsets come out of the queue in
+        non-increasing order of support and the search stops at the first one below the border.
+    """
+
+    frequent_patterns = dict()
+
+    if (k <= 0):
+        return frequent_patterns
+
+    # supports of the k most frequent itemsets (of at least `min_length` items) seen so far, as a min-heap
+    top_supports = []
+
+    def border() -> int:
+        return ((top_supports[0]) if (top_supports.__len__() == k) else (1))
+
+    def see(length : int, support : int) -> None:
+
+        if (length < min_length):
+            return
+
+        if (top_supports.__len__() < k):
+            heapq.heappush(top_supports, support)
+
+        elif (support > top_supports[0]):
+            heapq.heapreplace(top_supports, support)
+
+    # items in non-increasing order by occurrences, extensions of an itemset are the items after its last one
+    items = sorted(occurrences, key = lambda x : (-occurrences[x], x))
+
+    # queue of (-support, itemset as item indices, tidset), highest support first
+    queue = []
+
+    for idx, item in enumerate(items):
+
+        see(1, occurrences[item])
+
+        queue.append((-occurrences[item], (idx, ), tidsets[item]))
+
+    heapq.heapify(queue)
+
+    while (queue.__len__()):
+
+        (support, indices, tidset) = heapq.heappop(queue)
+
+        support = -support
+
+        # every itemset left in the queue (and every extension) is below the border
+        if (support < border()):
+            break
+
+        if (indices.__len__() >= min_length):
+            frequent_patterns[frozenset(map(items.__getitem__, indices))] = support
+
+        for other_idx in range(indices[-1] + 1, items.__len__()):
+
+            # items below the border cannot extend any itemset
+            if (occurrences[items[other_idx]] < border()):
+                break
+
+            child_tidset  = tidset & tidsets[items[other_idx]]
+
+            child_support = count_bitset_support(child_tidset, weight_masks)
+
+            if (child_support >= border()):
+
+                see(indices.__len__() + 1, child_support)
+
+                heapq.heappush(queue, (-child_support, (*indices, other_idx), child_tidset))
+
+    return frequent_patterns
+
+
+
+def mine_frequent_patterns(transactions : List[ List[ str ] ],
+                           min_sup_int  : int,
+                           diffsets     : Optional[ bool ] = None
+            ) -> Tuple[ Dict[ FrozenSet[ str ], int ], Dict[ str, int ] ]:
+
+    # tidset of each item, transactions of each count and occurrences of each distinct item
+    (tidsets, weight_masks, occurrences) = build_vertical_database(transactions)
+
+    # mine frequent patterns satisfying minimum support threshold
+    frequent_patterns = find_frequent_patterns(
+        tidsets,
+        weight_masks,
+        occurrences,
+        min_sup_int,
+        diffsets
+    )
+
+    # frequent patterns (dict) and occurrences of each distinct item (dict)
+    return (frequent_patterns, occurrences)
+
+
+
+def mine_closed_patterns(transactions : List[ List[ str ] ],
+                         min_sup_int  : int
+            ) -> Tuple[ Dict[ FrozenSet[ str ], int ], Dict[ str, int ] ]:
+
+    # tidset of each item, transactions of each count and occurrences of each distinct item
+    (tidsets, weight_masks, occurrences) = build_vertical_database(transactions)
+
+    # mine closed patterns satisfying minimum support threshold
+    closed_patterns = find_closed_patterns(
+        tidsets,
+        weight_masks,
+        occurrences,
+        min_sup_int
+    )
+
+    # closed patterns (dict) and occurrences of each distinct item (dict)
+    return (closed_patterns, occurrences)
+
+
+
+def mine_top_k_patterns(transactions : List[ List[ str ] ],
+                        k            : int,
+                        min_length   : int = 1
+            ) -> Tuple[ Dict[ FrozenSet[ str ], int ], Dict[ str, int ] ]:
+
+    # tidset of each item, transactions of each count and occurrences of each distinct item
+    (tidsets, weight_masks, occurrences) = build_vertical_database(transactions)
+
+    # mine the k most frequent patterns
+    top_k_patterns = find_top_k_patterns(
+        tidsets,
+        weight_masks,
+        occurrences,
+        k,
+        min_length
+    )
+
+    # top-k patterns (dict) and occurrences of each distinct item (dict)
+    return (top_k_patterns, occurrences)
+
+
+
+if (__name__ == "__main__"):
+
+    transactions = [
+        [ '9192', '31651', '45874' ],
+        [ '57515', '45874' ],
+        [ '45874', '9192' ],
+        [ '31651' ]
+    ]
+
+    min_sup_int = 1
+
+    frequent_patterns, occurrences = mine_frequent_patterns(transactions, min_sup_int)
+
+    print(frequent_patterns, occurrences)
+
+    closed_patterns, occurrences = mine_closed_patterns(transactions, min_sup_int)
+
+    print(closed_patterns, derive_support([ '9192' ], closed_patterns))
+
+    top_k_patterns, occurrences = mine_top_k_patterns(transactions, 3, min_length = 2)
+
+    print(top_k_patterns)
@@ -1,50 +1,145 @@
 from typing import *
+from array import array
+import itertools
+import sys
+import concurrent.futures
+from utilities import compact_transactions, count_transaction_items
 
-class TreeNode(object):
+class FPHeaders(dict):
 
-    NULL_LABEL = "null"
+    """Header table {  item : [ OCCU, HEAD, TAIL ]  } that keeps a reference to the FP-Tree owning its nodes."""
 
-    def __init__(self, label  : Optional[ str ] = NULL_LABEL, 
-                       count  : Optional[ int ] = 1,
-                       parent : Optional[ "TreeNode" ] = None) -> None:
+    def __init__(self, tree : "FPTree") -> None:
 
-        self.label    : str      = label
+        super().__init__()
 
-        self.count    : int      = count
+        self.tree : FPTree = tree
 
-        self.children : dict     = dict()
 
-        self.parent   : TreeNode = parent
 
-        self.friend   : TreeNode = None
+class FPTree(object):
 
-    def __contains__(self, __obj : Union[ str, "TreeNode" ]) -> bool:
+    """
+        Struct-of-arrays FP-Tree. Node `i` is described by the `i`-th entry of each column
+        (item code, count, parent index and friend link). Children are looked up in a single
+        index keyed by (parent << 32) | item code instead of a dictionary per node, and the
+        first-child / next-sibling columns are kept for walking the tree.
+    """
 
-        """Checks whether node contains such a child node."""
-        return (self.children.__contains__(__obj))
-    
-    def __getitem__(self, label : str) -> "TreeNode":
+    # item code stored at the null root
+    NULL_ITEM = -1
 
-        """Retrieves a child node by string label."""
-        return self.children[label]
+    # node index terminating friend links (and parent of the null root)
+    NULL_NODE = -1
 
-    def add_child(self, child_node : "TreeNode") -> None:
+    # node index of the null root
+    ROOT_NODE = 0
 
-        """Adds a child node to current node."""
-        self.children[child_node.label] = child_node
+    def __init__(self) -> None:
 
-    def __eq__(self, __obj : Union[ str, "TreeNode" ]) -> bool:
+        # item code of each node
+        self.items    : array = array("i", [  FPTree.NULL_ITEM  ])
+
+        # path count of each node (the null root keeps -1)
+        self.counts   : array = array("q", [  -1  ])
+
+        # parent node index of each node
+        self.parents  : array = array("i", [  FPTree.NULL_NODE  ])
+
+        # next node carrying the same item (friend link)
+        self.friends  : array = array("i", [  FPTree.NULL_NODE  ])
+
+        # first child of each node
+        self.children : array = array("i", [  FPTree.NULL_NODE  ])
+
+        # next child of the same parent
+        self.siblings : array = array("i", [  FPTree.NULL_NODE  ])
+
+        # child node of each (parent << 32) | item code
+        self.child_index : Dict[ int, int ] = dict()
+
+        # item label of each item code
+        self.labels   : list  = list()
+
+        # item code of each item label
+        self.codes    : dict  = dict()
+
+        # header table (friend links) of this tree
+        self.headers  : FPHeaders = FPHeaders(self)
+
+        # FP-array {  item : {  preceding_item : count  }  } recorded while building (FP-Growth* mode)
+        self.fp_array : Optional[ dict ] = None
+
+    def __len__(self) -> int:
+
+        """Number of nodes in FP-Tree, excluding the null root."""
+        return (self.items.__len__() - 1)
+
+    def item_code(self, label : Union[ int, str ]) -> int:
+
+        """Retrieves the item code of a label, assigning the next code to unseen labels."""
+        code = self.codes.get(label)
+
+        if (code is None):
+            code = self.codes[label] = self.labels.__len__()
+            self.labels.append(label)
+
+        return code
+
+    def label(self, node : int) -> Union[ int, str ]:
+
+        """Retrieves the item label of a node."""
+        return self.labels[self.items[node]]
+
+    def child(self, node : int, code : int) -> int:
+
+        """Retrieves the child of a node holding such an item code (or `NULL_NODE`)."""
+        return self.child_index.get((node << 32) | code, FPTree.NULL_NODE)
+
+    def add_child(self, node : int, code : int, count : int) -> int:
+
+        """Adds a child node to a node and returns its index."""
+        child = self.items.__len__()
+
+        self.items.append(code)
+        self.counts.append(count)
+        self.parents.append(node)
+        self.friends.append(FPTree.NULL_NODE)
+        self.children.append(FPTree.NULL_NODE)
+
+        # prepend child to the children of its parent
+        self.siblings.append(self.children[node])
+        self.children[node] = child
+
+        self.child_index[(node << 32) | code] = child
+
+        return child
+
+    def memory_usage(self) -> Dict[ str, Union[ int, float ] ]:
+
+        """Reports node count and bytes used by node columns and the child index."""
+        column_bytes = sum(
+            column.buffer_info()[1] * column.itemsize 
+                for column in (self.items, self.counts, self.parents, self.friends, self.children, self.siblings)
+        )
+
+        # hash table of the child index plus the int objects of its keys and values (one of each per node)
+        index_bytes = sys.getsizeof(self.child_index) + sum(
+            sys.getsizeof(key) + sys.getsizeof(child) for key, child in self.child_index.items()
+        )
+
+        return {
+            "nodes"          : self.__len__(),
+            "bytes"          : column_bytes + index_bytes,
+            "bytes_per_node" : (column_bytes + index_bytes) / self.items.__len__()
+        }
 
-        """Checks whether node labels match."""
-        if (isinstance(__obj, str)):
-            return (__obj == self.label)
-        
-        return (self.label == __obj.label)
-    
     def __repr__(self) -> str:
 
-        """Used to print out FP-Tree structure."""
-        return f"({self.label}:{self.count}){self.children}"
+        """Used to print out FP-Tree size."""
+        usage = self.memory_usage()
+
+        return f"FPTree(nodes={usage['nodes']}, items={self.labels.__len__()}, bytes_per_node={usage['bytes_per_node']:.1f})"
 
 
 
@@ -80,9 +175,10 @@ def sort_transactions_by_occurrence(transactions : List[ List[ Union[ int, str ]
         ((-1) if (leave_trail)                         else (None))                  
     )
 
-    # sort each transaction based on occurrences in non-increasing order
+    # sort each transaction based on occurrences in non-increasing order (ties broken by item, so that every
+    # transaction shares the same order and equal prefixes share the same path of the FP-Tree)
     for transaction in transactions:
-        transaction[indexing] = sorted(transaction[indexing], key = occurrences.__getitem__, reverse = True)
+        transaction[indexing] = sorted(transaction[indexing], key = lambda item : (-occurrences[item], item))
 
     return occurrences
 
@@ -116,169 +212,379 @@ HEADER_TAIL = 2
 
 
 
-def __construct_tree(headers     : Dict[ str, Tuple[ int, TreeNode, TreeNode ] ], 
-                     cur_node    : TreeNode, 
-                     transaction : List[ str ], 
+def __construct_tree(fp_tree     : FPTree, 
+                     transaction : List[ Union[ int, str ] ], 
+                     start       : int,
                      occurrence  : int) -> None:
 
-    # recursion base case => no more items in transaction
-    if (len(transaction) == 0):
-        return
-    
-    # next immediate item
-    cur_item = transaction[0]
+    # headers containing occurrences and friend links of each item
+    headers = fp_tree.headers
 
-    # current node already contains a child node labeled as such
-    if (cur_item in cur_node):
+    # start descending from the null root
+    cur_node = FPTree.ROOT_NODE
 
-        # fetch reference to this child node
-        child_node = cur_node[cur_item]
+    # walk the transaction in place (from index `start`) without slicing
+    for idx in range(start, transaction.__len__()):
 
-        # increment child node count by (an integer) `occurrence``
-        child_node.count += occurrence
+        # next immediate item
+        cur_item = transaction[idx]
 
-        # increment item node count in headers (friend link)
-        headers[cur_item][HEADER_OCCU] += occurrence
+        # item code of next immediate item
+        cur_code = fp_tree.item_code(cur_item)
 
-        # finish constructing FP-Tree with the remaining items and return
-        return __construct_tree(headers, child_node, transaction[1:], occurrence)
-    
-    # create a new child node for current node whose count equals to `occurrence` and parent to current node
-    child_node = TreeNode(label = cur_item, count = occurrence, parent = cur_node)
+        # fetch child node of current node labeled as such
+        child_node = fp_tree.child(cur_node, cur_code)
 
-    # add this new child node to current node's collection of children nodes
-    cur_node.add_child(child_node)
+        # current node already contains a child node labeled as such
+        if (child_node != FPTree.NULL_NODE):
 
-    # current item already added to headers (friend link)
-    if (cur_item in headers):
+            # increment child node count by (an integer) `occurrence``
+            fp_tree.counts[child_node] += occurrence
 
-        """
-            Append new child node to tail of friend linked list in headers (friend link)
-        """
+            # increment item node count in headers (friend link)
+            headers[cur_item][HEADER_OCCU] += occurrence
 
-        headers[cur_item][HEADER_TAIL].friend = child_node
+            # descend to the child node with the remaining items
+            cur_node = child_node
 
-        headers[cur_item][HEADER_TAIL] = child_node
+            continue
+        
+        # create a new child node for current node whose count equals to `occurrence` and parent to current node
+        child_node = fp_tree.add_child(cur_node, cur_code, occurrence)
 
-        # increment item node count in headers (friend link)
-        headers[cur_item][HEADER_OCCU] += occurrence
+        # current item already added to headers (friend link)
+        if (cur_item in headers):
 
-    else:
+            """
+                Append new child node to tail of friend linked list in headers (friend link)
+            """
 
-        # initialize headers at `cur_item` with a list of three things [ OCCU, HEAD, TAIL ]
-        headers[cur_item] = [  occurrence, child_node, child_node  ]
+            fp_tree.friends[headers[cur_item][HEADER_TAIL]] = child_node
 
-    # finish constructing FP-Tree with the remaining items and return
-    __construct_tree(headers, child_node, transaction[1:], occurrence)
+            headers[cur_item][HEADER_TAIL] = child_node
 
+            # increment item node count in headers (friend link)
+            headers[cur_item][HEADER_OCCU] += occurrence
 
+        else:
 
-def construct_tree(transactions : List[ List[ Union[ int, str ] ] ], 
-                   make_copy    : Optional[ bool ] = False
-            ) -> Tuple[ TreeNode, Dict[ str, Tuple[ int, TreeNode, TreeNode ] ] ]:
+            # initialize headers at `cur_item` with a list of three things [ OCCU, HEAD, TAIL ]
+            headers[cur_item] = [  occurrence, child_node, child_node  ]
+
+        # descend to the new child node with the remaining items
+        cur_node = child_node
+
+
+
+def __count_item_pairs(fp_array    : Dict[ Union[ int, str ], Dict[ Union[ int, str ], int ] ],
+                       transaction : List[ Union[ int, str ] ],
+                       start       : int,
+                       occurrence  : int) -> None:
+
+    """Records in the FP-array how often each item follows every other item of a transaction."""
+
+    for idx in range(start + 1, transaction.__len__()):
+
+        # co-occurrence counts of items preceding current item
+        pair_counts = fp_array.get(transaction[idx])
 
-    # initialize the dummy root node of FP-Tree
-    root = TreeNode(count = -1)
+        if (pair_counts is None):
+            pair_counts = fp_array[transaction[idx]] = dict()
 
-    # initialize empty dictionary to store header data (friend links)
-    headers = dict()
+        for prev_item in itertools.islice(transaction, start, idx):
+            pair_counts[prev_item] = pair_counts.get(prev_item, 0) + occurrence
+
+
+
+def insert_transactions(fp_tree      : FPTree,
+                        transactions : Iterable[ List[ Union[ int, str ] ] ]) -> FPTree:
+
+    """
+        Inserts a batch of weighted transactions [ count, item1, item2, ... ] into an FP-Tree.
+        Items must already be sorted (and filtered) in the order of the tree.
+    """
 
-    # do for each transaction
     for transaction in transactions:
 
-        """
-            Modify on a copy of the transaction if specified
-        """
+        __construct_tree(fp_tree, transaction, 1, transaction[0])
 
-        if (make_copy):
-            transaction = transaction.copy()
+        # keep the FP-array of FP-Growth* trees up to date
+        if (fp_tree.fp_array is not None):
+            __count_item_pairs(fp_tree.fp_array, transaction, 1, transaction[0])
 
-        # amount to increment by
-        occurrence = 1
+    return fp_tree
 
-        # set occurrence if first element in transaction if it is an integer
-        if (isinstance(transaction[0], int)):
-            occurrence = transaction.pop(0)
 
-        # recursively construct the FP-Tree with the current transaction
-        __construct_tree(headers, root, transaction, occurrence)
 
-    # return root of FP-Tree and the headers (friend links)
-    return (root, headers)
+def construct_tree(transactions : List[ List[ Union[ int, str ] ] ], 
+                   make_copy    : Optional[ bool ] = False,
+                   fp_array     : Optional[ bool ] = False
+            ) -> Tuple[ FPTree, FPHeaders ]:
+
+    # initialize an empty FP-Tree (with its dummy root node and empty headers)
+    fp_tree = FPTree()
+
+    # record pairwise item counts while building (FP-Growth*)
+    if (fp_array):
+        fp_tree.fp_array = dict()
+
+    # do for each transaction (transactions are read in place, `make_copy` is no longer needed)
+    for transaction in transactions:
+
+        # skip empty transactions
+        if (transaction.__len__() == 0):
+            continue
 
+        # weighted transaction => count is the first element and items start at index 1
+        (start, occurrence) = ((1, transaction[0]) if (isinstance(transaction[0], int)) else (0, 1))
 
+        # construct the FP-Tree with the current transaction
+        __construct_tree(fp_tree, transaction, start, occurrence)
 
-def __find_conditional_pattern_bases(item_node : TreeNode) -> List[ List[ Union[ int, str ] ] ]:
+        # count item pairs of current transaction in FP-array
+        if (fp_array):
+            __count_item_pairs(fp_tree.fp_array, transaction, start, occurrence)
+
+    # return FP-Tree and the headers (friend links)
+    return (fp_tree, fp_tree.headers)
+
+
+
+def __find_conditional_pattern_bases(fp_tree   : FPTree, 
+                                     item_node : int) -> List[ List[ Union[ int, str ] ] ]:
 
     # list of conditional pattern bases
     conditional_pattern_bases = []
 
+    # node columns of FP-Tree
+    (items, counts, parents, friends) = (fp_tree.items, fp_tree.counts, fp_tree.parents, fp_tree.friends)
+
+    # item label of each item code
+    labels = fp_tree.labels
+
+    # prefix paths (from the null root) already built for ancestor nodes, shared among friend nodes as
+    # ( path, length ) pairs, since every node visited by an ascent is a prefix of the same path
+    prefix_paths = dict()
+
     """
         Iterate through friend nodes
     """
 
     friend_node = item_node
 
-    while (friend_node is not None):
+    while (friend_node != FPTree.NULL_NODE):
 
-        """
-            Ascend from friend node to null root
-        """
+        # parent of friend node (the friend node itself is not part of its prefix path)
+        parent_node = parents[friend_node]
+
+        # only consider prefix paths with at least one item [ count, item1, item2, ... ] (nodes whose
+        # count dropped to zero, e.g. expired from a sliding window, carry no pattern base)
+        if ((parent_node != FPTree.ROOT_NODE) and (counts[friend_node] > 0)):
+
+            """
+                Ascend from parent node until reaching null root or an ancestor with a known prefix path
+            """
+
+            ascend_node = parent_node
+
+            # item labels collected from the bottom upwards and the nodes they were taken from
+            (path_suffix, ascended_nodes) = ([], [])
+
+            while ((ascend_node != FPTree.ROOT_NODE) and (ascend_node not in prefix_paths)):
+
+                # append item label (reversed once the ascent is over)
+                path_suffix.append(labels[items[ascend_node]])
+
+                ascended_nodes.append(ascend_node)
+
+                # ascend upwards toward the root
+                ascend_node = parents[ascend_node]
 
-        ascend_node = friend_node
+            path_suffix.reverse()
 
-        # storing path width as first element in prefix path
-        prefix_path = [  friend_node.count  ]
+            # reuse the prefix path of the deepest ancestor where the ascent stopped
+            if (ascend_node != FPTree.ROOT_NODE):
 
-        # do until reaching null root
-        while (ascend_node.label != TreeNode.NULL_LABEL):
+                (ancestor_path, ancestor_length) = prefix_paths[ascend_node]
 
-            # insert item label after path width (starting from index 1)
-            prefix_path.insert(1, ascend_node.label)
+                path_suffix = ancestor_path[:ancestor_length] + path_suffix
 
-            # ascend upwards toward the root
-            ascend_node = ascend_node.parent
+            # the node ascended from at depth d (parent node at 0) owns the path without its last d items
+            for depth, ascended_node in enumerate(ascended_nodes):
+                prefix_paths[ascended_node] = (path_suffix, path_suffix.__len__() - depth)
 
-        # add prefix path to conditional pattern bases if more than 1 items [ count, item1, item2, ... ]
-        if (prefix_path.__len__() > 2):
-            conditional_pattern_bases.append(prefix_path[:-1])
+            # storing path width as first element in prefix path
+            conditional_pattern_bases.append([  counts[friend_node], *path_suffix  ])
 
         # shift to next node in friend link
-        friend_node = friend_node.friend
+        friend_node = friends[friend_node]
 
     # return the conditional pattern bases
     return conditional_pattern_bases
 
 
 
+def __project_conditional_pattern_bases(fp_tree     : FPTree, 
+                                        item_node   : int,
+                                        min_sup_int : int,
+                                        occurrences : Optional[ Dict[ Union[ int, str ], int ] ] = None
+            ) -> Tuple[ List[ List[ Union[ int, str ] ] ], Dict[ Union[ int, str ], int ] ]:
+
+    """
+        Finds the conditional pattern bases already filtered by `min_sup_int` and sorted by 
+        occurrences in non-increasing order, ready to build the next conditional FP-Tree.
+        Item occurrences are counted from the pattern bases unless they are already known
+        (from an FP-array). Returns the projected paths and the occurrences of each item.
+    """
+
+    # prefix paths [ count, item1, item2, ... ] in the order of the FP-Tree
+    conditional_pattern_bases : Optional[ list ] = None
+
+    if (occurrences is None):
+
+        conditional_pattern_bases = __find_conditional_pattern_bases(fp_tree, item_node)
+
+        # occurrences of each item in the conditional pattern bases
+        occurrences = dict()
+
+        for prefix_path in conditional_pattern_bases:
+
+            # path width of prefix path
+            path_width = prefix_path[0]
+
+            for item in itertools.islice(prefix_path, 1, None):
+                occurrences[item] = occurrences.get(item, 0) + path_width
+
+    # rank of each frequent item (most frequent first, ties broken by label)
+    ranks = {  
+        item : rank for rank, item in enumerate(sorted(
+            filter(lambda x : occurrences[x] >= min_sup_int, occurrences), key = lambda x : (-occurrences[x], x)
+        ))  
+    }
+
+    # no frequent item => nothing to project (pattern bases need not even be extracted)
+    if (ranks.__len__() == 0):
+        return ([], occurrences)
+
+    if (conditional_pattern_bases is None):
+        conditional_pattern_bases = __find_conditional_pattern_bases(fp_tree, item_node)
+
+    projected_paths = []
+
+    for prefix_path in conditional_pattern_bases:
+
+        # frequent items of prefix path in order of rank
+        projected_path = sorted(filter(ranks.__contains__, itertools.islice(prefix_path, 1, None)), key = ranks.__getitem__)
+
+        if (projected_path.__len__()):
+            projected_paths.append([  prefix_path[0], *projected_path  ])
+
+    return (projected_paths, occurrences)
+
+
+
+def __find_single_prefix_path(fp_tree : FPTree) -> List[ int ]:
+
+    """Retrieves the nodes of the single path descending from the null root until the first branching (or leaf) node."""
+
+    # node columns of FP-Tree
+    (children, siblings) = (fp_tree.children, fp_tree.siblings)
+
+    prefix_path = []
+
+    cur_node = FPTree.ROOT_NODE
+
+    # descend while current node has exactly one child
+    while ((children[cur_node] != FPTree.NULL_NODE) and (siblings[children[cur_node]] == FPTree.NULL_NODE)):
+
+        cur_node = children[cur_node]
+
+        prefix_path.append(cur_node)
+
+    return prefix_path
+
+
+
+def __mine_single_prefix_path(frequent_patterns : List[ List[ Union[ int, str ] ] ], 
+                              accum             : List[ Union[ int, str ] ], 
+                              fp_tree           : FPTree,
+                              prefix_path       : List[ int ],
+                              min_sup_int       : int
+            ) -> None:
+
+    """Emits every combination of the prefix path nodes, whose support is the count of its deepest node."""
+
+    # node columns of FP-Tree
+    counts = fp_tree.counts
+
+    # only nodes satisfying minimum threshold (counts are non-increasing along the path)
+    prefix_path = [  node for node in prefix_path if (counts[node] >= min_sup_int)  ]
+
+    for length in range(1, prefix_path.__len__() + 1):
+
+        for combination in itertools.combinations(prefix_path, length):
+
+            # support count is bounded by the deepest node of the combination
+            path_width = min(accum[0], counts[combination[-1]])
+
+            frequent_patterns.append([  path_width, *map(fp_tree.label, combination), *accum[1:]  ])
+
+
+
 def __mine_patterns(frequent_patterns : List[ List[ Union[ int, str ] ] ], 
                     accum             : List[ Union[ int, str ] ], 
-                    cur_node          : TreeNode, 
+                    fp_tree           : FPTree,
+                    cur_node          : int, 
                     min_sup_int       : int                             
             ) -> None:
 
-    # find the conditional pattern bases
-    conditional_pattern_bases : list = __find_conditional_pattern_bases(cur_node)
+    # item occurrences of the conditional pattern bases are known from the FP-array, if recorded
+    fp_array_row : Optional[ dict ] = ((None) if (fp_tree.fp_array is None) else (fp_tree.fp_array.get(fp_tree.label(cur_node), {})))
+
+    # find the conditional pattern bases, already filtered and sorted by occurrences
+    (conditional_pattern_bases, occurrences) = __project_conditional_pattern_bases(fp_tree, cur_node, min_sup_int, fp_array_row)
+
+    # mine the conditional FP-Tree built from the pattern bases
+    __mine_conditional_pattern_bases(frequent_patterns, accum, conditional_pattern_bases, min_sup_int, (fp_tree.fp_array is not None))
+
+
+
+def __mine_conditional_pattern_bases(frequent_patterns         : List[ List[ Union[ int, str ] ] ], 
+                                     accum                     : List[ Union[ int, str ] ], 
+                                     conditional_pattern_bases : List[ List[ Union[ int, str ] ] ],
+                                     min_sup_int               : int,
+                                     fp_array                  : bool
+            ) -> None:
 
     # recursion base case, no more pattern bases to build conditional FP-Trees
     if (len(conditional_pattern_bases) == 0):
         return
 
-    # sort conditional pattern bases as though they are transactions, and store occurrences
-    occurrences : dict = sort_transactions_by_occurrence(conditional_pattern_bases, leave_trail = False)
+    # merge pattern bases that became identical after filtering
+    conditional_pattern_bases : list = compact_transactions(conditional_pattern_bases)[0]
 
-    # filter items from conditional pattern bases with support count lower than minimum threshold
-    filter_transactions_by_occurrences(conditional_pattern_bases, occurrences, min_sup_int, leave_trail = False)
+    # conditional FP-Tree and its headers containing occurrences and friend links of each item
+    (cond_tree, fp_headers) = construct_tree(conditional_pattern_bases, fp_array = fp_array)
 
-    # headers containing occurrences and friend links of each item
-    fp_headers : list = construct_tree(conditional_pattern_bases)[1]
+    # nodes of the single path shared by every branch of the conditional FP-Tree
+    prefix_path : list = __find_single_prefix_path(cond_tree)
+
+    # emit combinations of prefix path items directly instead of recursing along the chain
+    __mine_single_prefix_path(frequent_patterns, accum, cond_tree, prefix_path, min_sup_int)
+
+    # items on the prefix path appear nowhere else in the conditional FP-Tree
+    prefix_items : set = set(map(cond_tree.label, prefix_path))
 
     # temporarily store the original minimum path width prior to modification
     accum_tmp : int = accum[0]
 
-    # do the following for each item in headers in non-decreasing order (by occurrences)
+    # do the following for each item (below the prefix path) in headers in non-decreasing order (by occurrences)
     for item, header in sorted(fp_headers.items(), key = lambda x : x[1][HEADER_OCCU]):
 
+        # already emitted with the prefix path
+        if (item in prefix_items):
+            continue
+
         # update minimum width of current path (itemset)
         accum[0] = min(accum[0], header[HEADER_OCCU])
 
@@ -292,7 +598,7 @@ def __mine_patterns(frequent_patterns : List[ List[ Union[ int, str ] ] ],
             frequent_patterns.append(accum.copy())
 
             # mine the remaining items to be added to path list
-            __mine_patterns(frequent_patterns, accum, header[HEADER_HEAD], min_sup_int)
+            __mine_patterns(frequent_patterns, accum, cond_tree, header[HEADER_HEAD], min_sup_int)
 
             # undo insertion of current item to path list
             accum.pop(1)
@@ -337,14 +643,76 @@ def format_frequent_patterns(frequent_patterns : List[ List[ Union[ int, str ] ]
 
 
 
-def mine_patterns(fp_headers  : Dict[ str, Tuple[ int, TreeNode, TreeNode ] ], 
-                  min_sup_int : int
+def __mine_header_item(accum                     : List[ Union[ int, str ] ], 
+                       conditional_pattern_bases : List[ List[ Union[ int, str ] ] ],
+                       min_sup_int               : int,
+                       fp_array                  : bool
+            ) -> Dict[ FrozenSet[ str ], int ]:
+
+    """Worker task of the parallel mode: mines every pattern ending with the item of `accum` from its conditional pattern bases."""
+
+    frequent_patterns = [  accum.copy()  ]
+
+    __mine_conditional_pattern_bases(frequent_patterns, accum, conditional_pattern_bases, min_sup_int, fp_array)
+
+    return format_frequent_patterns(frequent_patterns)
+
+
+
+def mine_patterns(fp_headers  : FPHeaders, 
+                  min_sup_int : int,
+                  max_workers : Optional[ int ] = None,
+                  items       : Optional[ Iterable[ Union[ int, str ] ] ] = None
             ) -> Dict[ str, Dict[ Tuple[ str ], int ] ]:
 
+    """
+        Mines the frequent patterns of an FP-Tree. With `max_workers` greater than 1 the header items are
+        mined in parallel: the conditional pattern bases of each item are projected here and sent to a
+        process pool, most frequent items (largest pattern bases) first, and the resulting dicts are merged.
+        With `items` only the patterns whose least frequent item is one of `items` are mined.
+    """
+
+    # FP-Tree owning the nodes referenced by the headers
+    fp_tree : FPTree = fp_headers.tree
+
+    # header items to mine
+    header_items = ((fp_headers.items()) if (items is None) else ([  (item, fp_headers[item]) for item in items if (item in fp_headers)  ]))
+
+    if (max_workers is not None and max_workers > 1):
+
+        frequent_patterns = dict()
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers = max_workers) as executor:
+
+            futures = []
+
+            # header counts estimate the cost of each item, so schedule the most expensive items first
+            for item, header in sorted(header_items, key = lambda x : -x[1][HEADER_OCCU]):
+
+                # item occurrences of the conditional pattern bases are known from the FP-array, if recorded
+                fp_array_row : Optional[ dict ] = ((None) if (fp_tree.fp_array is None) else (fp_tree.fp_array.get(item, {})))
+
+                # pattern bases of item, already filtered and sorted by occurrences
+                conditional_pattern_bases = __project_conditional_pattern_bases(fp_tree, header[HEADER_HEAD], min_sup_int, fp_array_row)[0]
+
+                futures.append(executor.submit(
+                    __mine_header_item,
+                    [  header[HEADER_OCCU], item  ],
+                    conditional_pattern_bases,
+                    min_sup_int,
+                    (fp_tree.fp_array is not None)
+                ))
+
+            # merge patterns of every item (patterns of different items never overlap)
+            for future in futures:
+                frequent_patterns.update(future.result())
+
+        return frequent_patterns
+
     frequent_patterns = []
 
     # do the following for each item in non-decreasing order by occurrences
-    for item, header in sorted(fp_headers.items(), key = lambda x : x[1][HEADER_OCCU]):
+    for item, header in sorted(header_items, key = lambda x : x[1][HEADER_OCCU]):
 
         # initialize `accum` with [ path_width : int, item_label : str ]
         accum = [  header[HEADER_OCCU], item  ]
@@ -353,7 +721,7 @@ def mine_patterns(fp_headers  : Dict[ str, Tuple[ int, TreeNode, TreeNode ] ],
         frequent_patterns.append(accum.copy())
 
         # mine the remaining patterns to be added
-        __mine_patterns(frequent_patterns, accum, header[HEADER_HEAD], min_sup_int)
+        __mine_patterns(frequent_patterns, accum, fp_tree, header[HEADER_HEAD], min_sup_int)
 
     # hash frequent patterns into a dictionary for easy lookup
     frequent_patterns : dict = format_frequent_patterns(frequent_patterns)
@@ -363,26 +731,274 @@ def mine_patterns(fp_headers  : Dict[ str, Tuple[ int, TreeNode, TreeNode ] ],
 
 
 def mine_frequent_patterns(transactions : List[ List[ str ] ], 
-                           min_sup_int  : int
+                           min_sup_int  : int,
+                           fp_array     : Optional[ bool ] = False,
+                           max_workers  : Optional[ int ]  = None
             ) -> Tuple[ Dict[ str, Dict[ Tuple[ str ], int ] ], Dict[ str, int ] ]:
 
+    """
+        Mines frequent patterns with FP-growth. With `fp_array` the FP-Growth* variant is used: pairwise
+        item counts are recorded while each FP-Tree is built, so that the frequent items of every
+        conditional FP-Tree are known without another counting pass over its pattern bases. With
+        `max_workers` greater than 1 the header items are mined by a process pool (see `mine_patterns`).
+    """
+
     # sort transactions by occurrences in non-increasing order and save occurrences dictionary
     occurrences : dict = sort_transactions_by_occurrence(transactions)
 
     # filter infrequent items in transactions
     filter_transactions_by_occurrences(transactions, occurrences, min_sup_int)
 
+    # merge transactions that became identical into unique weighted rows
+    transactions : list = compact_transactions(transactions)[0]
+
     # construct FP-Tree and save the header data (friend links)
-    fp_headers : list = construct_tree(transactions)[1]
+    fp_headers : list = construct_tree(transactions, fp_array = fp_array)[1]
 
     # mine the frequent patterns (itemsets) given FP-Tree
-    frequent_patterns : dict = mine_patterns(fp_headers, min_sup_int)
+    frequent_patterns : dict = mine_patterns(fp_headers, min_sup_int, max_workers)
 
     # the frequent patterns formatted as a dictionary and the occurrences of each item
     return (frequent_patterns, occurrences)
 
 
 
+class MFITree(object):
+
+    """
+        Maximal frequent itemsets found so far, stored as a prefix tree whose items follow a fixed rank order. Only
+        parents, labels, children and the node-links of each item are kept (no counts or header occurrences as in an
+        FP-Tree), since MFI-trees are only built and walked. Subset checks follow the node-links of the last item of an
+        itemset and look for its other items on the way to the root.
+    """
+
+    # node index of the root
+    ROOT_NODE = 0
+
+    def __init__(self, ranks : Dict[ Union[ int, str ], int ]) -> None:
+
+        # rank of each item (order of items along paths)
+        self.ranks       : Dict[ Union[ int, str ], int ] = ranks
+
+        # parent node index and item label of each node (the root is its own parent)
+        self.parents     : List[ int ] = [  MFITree.ROOT_NODE  ]
+        self.labels      : List[ Union[ int, str ] ] = [  None  ]
+
+        # child nodes of each node {  item : child  }
+        self.children    : List[ Dict[ Union[ int, str ], int ] ] = [  dict()  ]
+
+        # nodes holding each item {  item : [ node, ... ]  }
+        self.node_links  : Dict[ Union[ int, str ], List[ int ] ] = dict()
+
+    def __len__(self) -> int:
+
+        """Number of nodes in MFI-tree, excluding the root."""
+        return (self.parents.__len__() - 1)
+
+    def insert(self, itemset : Iterable[ Union[ int, str ] ]) -> None:
+
+        """Inserts an itemset along the path of its items in rank order."""
+
+        (children, cur_node) = (self.children, MFITree.ROOT_NODE)
+
+        for item in sorted(itemset, key = self.ranks.__getitem__):
+
+            child_node = children[cur_node].get(item)
+
+            if (child_node is None):
+
+                child_node = children[cur_node][item] = self.parents.__len__()
+
+                self.parents.append(cur_node)
+                self.labels.append(item)
+                children.append(dict())
+
+                self.node_links.setdefault(item, []).append(child_node)
+
+            cur_node = child_node
+
+    def prefix_paths(self, item : Union[ int, str ]) -> Iterator[ List[ Union[ int, str ] ] ]:
+
+        """Items above each node holding `item` (stored itemsets containing `item`, without it), from the bottom up."""
+
+        (parents, labels) = (self.parents, self.labels)
+
+        for node in self.node_links.get(item, ()):
+
+            (prefix_path, ascend_node) = ([], parents[node])
+
+            while (ascend_node != MFITree.ROOT_NODE):
+
+                prefix_path.append(labels[ascend_node])
+
+                ascend_node = parents[ascend_node]
+
+            yield prefix_path
+
+    def covers(self, itemset : Iterable[ Union[ int, str ] ]) -> bool:
+
+        """Whether `itemset` is a subset of a stored itemset."""
+
+        (ranks, parents, labels) = (self.ranks, self.parents, self.labels)
+
+        itemset = sorted(itemset, key = ranks.__getitem__)
+
+        if (itemset.__len__() == 0):
+            return (self.__len__() > 0)
+
+        for node in self.node_links.get(itemset[-1], ()):
+
+            # match the remaining items (in reverse rank order) on the path to the root
+            (idx, ascend_node) = (itemset.__len__() - 2, parents[node])
+
+            while ((idx >= 0) and (ascend_node != MFITree.ROOT_NODE)):
+
+                label = labels[ascend_node]
+
+                if (label == itemset[idx]):
+                    idx -= 1
+
+                # items ranked before the wanted one cannot lead to it
+                elif (ranks[label] < ranks[itemset[idx]]):
+                    break
+
+                ascend_node = parents[ascend_node]
+
+            if (idx < 0):
+                return True
+
+        return False
+
+
+
+def __mine_maximal_patterns(maximal_patterns : Dict[ FrozenSet[ Union[ int, str ] ], int ],
+                            mfi_tree         : MFITree,
+                            head             : List[ Union[ int, str ] ],
+                            head_support     : int,
+                            fp_tree          : FPTree,
+                            min_sup_int      : int
+            ) -> List[ List[ Union[ int, str ] ] ]:
+
+    """
+        FPMax: finds the maximal frequent itemsets extending `head` in its conditional FP-Tree. Items are mined from the
+        least frequent up, so an itemset found later is never a superset of one found earlier, and a branch is pruned
+        as soon as its head-union-tail (head, item and every frequent item of its pattern bases) is covered. Subset
+        checks use the conditional MFI-tree of head: the known maximal itemsets containing head (without it), cut to
+        the items of `fp_tree`. Itemsets found by a branch are inserted into it once the branch returns, and the new
+        maximal itemsets of this call (without head) are returned so that the caller can do the same.
+    """
+
+    # new maximal itemsets extending head, without the items of head
+    found_patterns = []
+
+    # nodes of the single path shared by every branch of the conditional FP-Tree
+    prefix_path : list = __find_single_prefix_path(fp_tree)
+
+    # the whole tree is a single path => head and all of its items form the only candidate
+    if (fp_tree.children[(prefix_path[-1]) if (prefix_path.__len__()) else (FPTree.ROOT_NODE)] == FPTree.NULL_NODE):
+
+        path_items = list(map(fp_tree.label, prefix_path))
+
+        if ((head.__len__() or path_items.__len__()) and (not mfi_tree.covers(path_items))):
+
+            maximal_patterns[frozenset([ *head, *path_items ])] = ((min(head_support, fp_tree.counts[prefix_path[-1]])) if (prefix_path.__len__()) else (head_support))
+
+            found_patterns.append(path_items)
+
+        return found_patterns
+
+    # least frequent items first (reverse order of the tree)
+    for item, header in sorted(fp_tree.headers.items(), key = lambda x : (-x[1][HEADER_OCCU], x[0]), reverse = True):
+
+        # support of head with item
+        support = min(head_support, header[HEADER_OCCU])
+
+        # pattern bases of item, already filtered and sorted by occurrences
+        (conditional_pattern_bases, occurrences) = __project_conditional_pattern_bases(fp_tree, header[HEADER_HEAD], min_sup_int)
+
+        # frequent items that may still extend head and item
+        tail = [  x for x, count in occurrences.items() if (count >= min_sup_int)  ]
+
+        # head-union-tail pruning: every itemset of this branch is a subset of a known maximal itemset
+        if (mfi_tree.covers([ item, *tail ])):
+            continue
+
+        # nothing extends head and item, which are not covered either
+        if (conditional_pattern_bases.__len__() == 0):
+
+            maximal_patterns[frozenset([ *head, item ])] = support
+
+            branch_patterns = [  []  ]
+
+        else:
+
+            # conditional FP-Tree of head and item
+            cond_tree = construct_tree(compact_transactions(conditional_pattern_bases)[0])[0]
+
+            # conditional MFI-tree of head and item: known maximal itemsets containing item, cut to the items of `cond_tree`
+            cond_ranks = {  
+                x : rank for rank, x in enumerate(sorted(cond_tree.headers, key = lambda x : (-cond_tree.headers[x][HEADER_OCCU], x)))  
+            }
+
+            cond_mfi_tree = MFITree(cond_ranks)
+
+            for mfi_path in mfi_tree.prefix_paths(item):
+                cond_mfi_tree.insert(filter(cond_ranks.__contains__, mfi_path))
+
+            branch_patterns = __mine_maximal_patterns(maximal_patterns, cond_mfi_tree, [ *head, item ], support, cond_tree, min_sup_int)
+
+        # fold the maximal itemsets of the branch (which all contain item) into the MFI-tree of head
+        for branch_pattern in branch_patterns:
+
+            branch_pattern.append(item)
+
+            mfi_tree.insert(branch_pattern)
+
+            found_patterns.append(branch_pattern)
+
+    return found_patterns
+
+
+
+def mine_maximal_patterns(transactions : List[ List[ str ] ], 
+                          min_sup_int  : int
+            ) -> Tuple[ Dict[ FrozenSet[ str ], int ], Dict[ str, int ] ]:
+
+    """
+        Mines the maximal frequent itemsets (frequent itemsets without a frequent superset) with FPMax, so that
+        the work follows the number of maximal itemsets instead of all frequent ones. Transactions are left untouched.
+    """
+
+    occurrences : dict = count_transaction_items(transactions)
+
+    # rank of each frequent item (most frequent first, ties broken by label)
+    ranks = {  
+        item : rank for rank, item in enumerate(sorted(
+            filter(lambda x : occurrences[x] >= min_sup_int, occurrences), key = lambda x : (-occurrences[x], x)
+        ))  
+    }
+
+    rows = []
+
+    for transaction in transactions:
+
+        (weight, items) = ((transaction[0], transaction[1:]) if (transaction.__len__() and isinstance(transaction[0], int)) else (1, transaction))
+
+        # distinct frequent items in order of rank
+        rows.append([ weight, *sorted(set(filter(ranks.__contains__, items)), key = ranks.__getitem__) ])
+
+    fp_tree = construct_tree(compact_transactions(rows)[0])[0]
+
+    maximal_patterns = dict()
+
+    if (fp_tree.__len__()):
+        __mine_maximal_patterns(maximal_patterns, MFITree(ranks), [], sum(row[0] for row in rows), fp_tree, min_sup_int)
+
+    # the maximal patterns formatted as a dictionary and the occurrences of each item
+    return (maximal_patterns, occurrences)
+
+
+
 if (__name__ == "__main__"):
 
     transactions = [
@@ -408,12 +1024,21 @@ if (__name__ == "__main__"):
 
     # for item, header in fp_headers.items():
 
-    #     print(item, header[HEADER_OCCU], id(header[HEADER_HEAD]), id(header[HEADER_TAIL]), header[HEADER_HEAD].label, header[HEADER_TAIL].label)
+    #     print(item, header[HEADER_OCCU], header[HEADER_HEAD], header[HEADER_TAIL], fp_tree.label(header[HEADER_HEAD]), fp_tree.label(header[HEADER_TAIL]))
+
+    # print(fp_tree.memory_usage())
 
     # frequent_patterns = mine_patterns(fp_headers, min_sup_int)
 
     # print(frequent_patterns)
 
+    # node count and bytes per node of the FP-Tree
+    print(construct_tree(transactions)[0].memory_usage())
+
     frequent_patterns = mine_frequent_patterns(transactions, min_sup_int)
 
-    print(frequent_patterns)
\ No newline at end of file
+    print(frequent_patterns)
+
+    maximal_patterns = mine_maximal_patterns(transactions, min_sup_int)
+
+    print(maximal_patterns)
\ No newline at end of file
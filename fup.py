@@ -0,0 +1,207 @@
+from typing import *
+from support_counting import CandidateTrie
+from apriori_2 import format_transactions
+import eclat
+import copy
+
+"""
+    Incremental maintenance of frequent itemsets when transactions are appended (FUP), on the usual
+    {  frozenset(itemset) : support  } result format. Besides the frequent itemsets, itemsets of the negative border
+    (itemsets that are not frequent although all their subsets are) are kept with their supports: the new support
+    of any itemset of either collection is its old support plus its support in the delta, so the old database is
+    scanned only for candidates that were neither, and only if they are frequent enough in the delta to be
+    frequent overall. Correctness only relies on the frequent itemsets being complete, the border is a cache of
+    known supports: an update drops the border itemsets whose supports it did not need to count exactly.
+"""
+
+def __generate_candidates(frequent_k : Set[ FrozenSet[ Any ] ]) -> List[ FrozenSet[ Any ] ]:
+
+    """Apriori-gen: (k + 1)-itemsets joined from frequent k-itemsets sharing k - 1 items, whose k-subsets are all frequent."""
+
+    # frequent k-itemsets grouped by their first (k - 1) items {  prefix : [ last_item, ... ]  }
+    prefix_groups = dict()
+
+    for itemset in frequent_k:
+
+        items = sorted(itemset)
+
+        prefix_groups.setdefault(tuple(items[:-1]), []).append(items[-1])
+
+    candidates = []
+
+    for prefix, last_items in prefix_groups.items():
+
+        last_items.sort()
+
+        for i in range(last_items.__len__() - 1):
+
+            for j in range(i + 1, last_items.__len__()):
+
+                candidate = frozenset([ *prefix, last_items[i], last_items[j] ])
+
+                # downward closure: every k-subset must be frequent
+                if (all((candidate - {  item  }) in frequent_k for item in prefix)):
+                    candidates.append(candidate)
+
+    return candidates
+
+
+
+def __count_supports(transactions : List[ Tuple[ int, Set[ Any ] ] ], candidates : List[ FrozenSet[ Any ] ]) -> Dict[ FrozenSet[ Any ], int ]:
+
+    """Support counts of candidates (of any lengths) with one scan of the transactions per candidate length."""
+
+    supports = dict()
+
+    # candidates of each length {  length : [ candidate, ... ]  }
+    levels = dict()
+
+    for candidate in candidates:
+        levels.setdefault(candidate.__len__(), []).append(candidate)
+
+    for level in levels.values():
+        supports.update(zip(level, CandidateTrie(level).count_supports(transactions)))
+
+    return supports
+
+
+
+def find_negative_border(frequent_patterns : Dict[ FrozenSet[ Any ], int ],
+                         transactions      : List[ List[ Union[ int, str ] ] ]
+            ) -> Dict[ FrozenSet[ Any ], int ]:
+
+    """Negative border of the frequent itemsets of `transactions`, with its support counts."""
+
+    transactions = format_transactions(transactions)
+
+    # frequent itemsets of each length {  length : {  itemset, ...  }  }
+    levels = dict()
+
+    for itemset in frequent_patterns:
+        levels.setdefault(itemset.__len__(), set()).add(itemset)
+
+    # infrequent items, then candidates of each level that are not frequent
+    candidates = list({  frozenset([ item ]) for _, transaction in transactions for item in transaction  }.difference(frequent_patterns))
+
+    for frequent_k in levels.values():
+        candidates.extend(filter(lambda x : x not in frequent_patterns, __generate_candidates(frequent_k)))
+
+    return __count_supports(transactions, candidates)
+
+
+
+def initialize_frequent_patterns(transactions           : List[ List[ Union[ int, str ] ] ],
+                                 min_sup_float          : float,
+                                 mine_frequent_patterns : Callable = eclat.mine_frequent_patterns
+            ) -> Tuple[ Dict[ FrozenSet[ Any ], int ], Dict[ FrozenSet[ Any ], int ] ]:
+
+    """Initial frequent itemsets (with any engine) and negative border of `transactions` at relative support `min_sup_float`."""
+
+    num_transactions = sum(weight for weight, _ in format_transactions(transactions))
+
+    frequent_patterns = mine_frequent_patterns(copy.deepcopy(transactions), min_sup_float * num_transactions)[0]
+
+    return (frequent_patterns, find_negative_border(frequent_patterns, transactions))
+
+
+
+def update_frequent_patterns(frequent_patterns  : Dict[ FrozenSet[ Any ], int ],
+                             negative_border    : Dict[ FrozenSet[ Any ], int ],
+                             old_transactions   : List[ List[ Union[ int, str ] ] ],
+                             delta_transactions : List[ List[ Union[ int, str ] ] ],
+                             min_sup_float      : float
+            ) -> Tuple[ Dict[ FrozenSet[ Any ], int ], Dict[ FrozenSet[ Any ], int ] ]:
+
+    """
+        Given the frequent itemsets and negative border of `old_transactions` at relative support `min_sup_float`,
+        find those of `old_transactions` + `delta_transactions` level by level:
+
+            1. candidates of level k + 1 are generated from the new frequent k-itemsets (every item at level 1)
+            2. candidates are counted in the delta, and their old supports are known if they were frequent or in the border
+            3. other candidates were infrequent in the old database, so they can only be frequent overall if they
+               are frequent in the delta, and only these are counted in the old database (one scan per level)
+
+        The returned negative border holds the infrequent candidates whose new supports were counted. Candidates
+        pruned in step 3 are infrequent too but their supports are unknown, so they are left out of it and are
+        handled by later updates like any other itemset that was not frequent.
+    """
+
+    (old_transactions, delta_transactions) = (format_transactions(old_transactions), format_transactions(delta_transactions))
+
+    (num_old, num_delta) = (sum(weight for weight, _ in old_transactions), sum(weight for weight, _ in delta_transactions))
+
+    # thresholds of the whole and of the delta database
+    (min_sup_total, min_sup_delta) = (min_sup_float * (num_old + num_delta), min_sup_float * num_delta)
+
+    (new_frequent_patterns, new_negative_border) = (dict(), dict())
+
+    # every item known from the old database or appearing in the delta
+    candidates = list({
+        *filter(lambda x : x.__len__() == 1, frequent_patterns),
+        *filter(lambda x : x.__len__() == 1, negative_border),
+        *(frozenset([ item ]) for _, transaction in delta_transactions for item in transaction)
+    })
+
+    while (candidates.__len__()):
+
+        delta_supports = __count_supports(delta_transactions, candidates)
+
+        supports = dict()
+
+        # candidates to be counted in the old database
+        unknown_candidates = []
+
+        for candidate in candidates:
+
+            old_support = frequent_patterns.get(candidate, negative_border.get(candidate))
+
+            if (old_support is not None):
+                supports[candidate] = old_support + delta_supports[candidate]
+
+            # infrequent in the old database and in the delta => infrequent overall (support unknown, not kept)
+            elif (delta_supports[candidate] >= min_sup_delta):
+                unknown_candidates.append(candidate)
+
+        for candidate, old_support in __count_supports(old_transactions, unknown_candidates).items():
+            supports[candidate] = old_support + delta_supports[candidate]
+
+        frequent_k = set()
+
+        for candidate, support in supports.items():
+
+            if (support >= min_sup_total):
+
+                new_frequent_patterns[candidate] = support
+
+                frequent_k.add(candidate)
+
+            else:
+                new_negative_border[candidate] = support
+
+        candidates = __generate_candidates(frequent_k)
+
+    return (new_frequent_patterns, new_negative_border)
+
+
+
+if (__name__ == "__main__"):
+
+    transactions = [
+        [ '9192', '31651', '45874' ],
+        [ '57515', '45874' ],
+        [ '45874', '9192' ],
+        [ '31651' ]
+    ]
+
+    delta_transactions = [
+        [ '57515', '45874' ],
+        [ '57515', '31651' ]
+    ]
+
+    min_sup_float = 0.5
+
+    frequent_patterns, negative_border = initialize_frequent_patterns(transactions, min_sup_float)
+
+    print(frequent_patterns, negative_border)
+
+    print(update_frequent_patterns(frequent_patterns, negative_border, transactions, delta_transactions, min_sup_float))
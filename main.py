@@ -76,19 +76,31 @@ class TreeNode(object):
         return self.children_nodes[item_label]
     
 
+def is_weighted(transactions : List[ List[ Any ] ]) -> bool:
+
+    # weighted transactions store an integer count in front [ count, item1, item2, ... ]
+    return ((transactions.__len__() > 0) and (transactions[0].__len__() > 0) and isinstance(transactions[0][0], int))
+
+
 def count_transaction_occurrences(transactions : List[ List[ Any ] ]) -> Dict[ Any, int ]:
 
     # initialize empty dictionary
     occurrences = dict()
 
+    # skip the integer count of weighted transactions
+    weighted = is_weighted(transactions)
+
     # iterate through each transaction
     for transaction in transactions:
 
+        # amount to increment by
+        occ = ((transaction[0]) if (weighted) else (1))
+
         # iterate through each item
-        for item in transaction:
+        for item in transaction[int(weighted):]:
 
             # increment item occurrence
-            occurrences[item] = occurrences.get(item, 0) + 1
+            occurrences[item] = occurrences.get(item, 0) + occ
 
     # return occurrences dictionary
     return occurrences
@@ -96,22 +108,28 @@ def count_transaction_occurrences(transactions : List[ List[ Any ] ]) -> Dict[ A
 
 def sort_transaction_by_occurrences(transactions : List[ List[ Any ] ], occurrences  : Dict[ Any, int ]) -> None:
     
+    # leave the integer count of weighted transactions in front
+    indexing = slice(int(is_weighted(transactions)), None)
+
     # iterate through each transaction
     for transaction in transactions:
 
         # sort items in transaction by occurrences in non-increasing order
-        transaction.sort(key = occurrences.__getitem__, reverse = True)
+        transaction[indexing] = sorted(transaction[indexing], key = occurrences.__getitem__, reverse = True)
 
 
 def filter_transactions_by_occurrences(transactions : List[ List[ Any ] ], 
                                        occurrences  : Dict[ Any, int ],
                                        min_sup_int  : int) -> None:
 
+    # leave the integer count of weighted transactions in front
+    indexing = slice(int(is_weighted(transactions)), None)
+
     # iterate through each transaction
     for transaction in transactions:
 
         # filter items below support threshold
-        transaction[:] = list(filter(lambda x : occurrences[x] >= min_sup_int, transaction))
+        transaction[indexing] = list(filter(lambda x : occurrences[x] >= min_sup_int, transaction[indexing]))
 
 
 def prepend_transaction_occurrences(transactions : List[ List[ Any ] ]) -> None:
@@ -356,13 +374,17 @@ def count_fp_tree_item_occurrence(occurrence : list, fp_node : TreeNode, item :
 
 def mine_frequent_patterns(transactions : List[ List[ int ] ], min_sup_int : int):
 
+    weighted = is_weighted(transactions)
+
     occurrences = count_transaction_occurrences(transactions = transactions)
 
     sort_transaction_by_occurrences(transactions = transactions, occurrences = occurrences)
 
     filter_transactions_by_occurrences(transactions = transactions, occurrences = occurrences, min_sup_int = min_sup_int)
 
-    prepend_transaction_occurrences(transactions = transactions)
+    # weighted transactions already carry their counts
+    if (not weighted):
+        prepend_transaction_occurrences(transactions = transactions)
 
     fp_tree, fp_headers = construct_fp_tree(transactions = transactions, min_sup_int = min_sup_int)
 
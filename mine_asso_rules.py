@@ -42,107 +42,87 @@ def extract_frequent_itemsets(
 
 
 
-def _mine_association_rules(association_rules              : Set[ Tuple[ FrozenSet[ str ], FrozenSet[ str ], float, int ] ], 
-                            frequent_itemsets_with_support : Dict[ FrozenSet[ str ], int ], #Dict[ Any, Dict[ Tuple[ Any ], int ] ],
-                            antecedent                     : Set[ str ], #Dict[ Any, int ], 
-                            consequent                     : Set[ str ], #Dict[ Any, int ], 
+def _mine_association_rules(association_rules              : List[ Tuple[ FrozenSet[ str ], FrozenSet[ str ], float, float, float ] ], 
+                            frequent_itemsets_with_support : Dict[ FrozenSet[ str ], int ],
+                            frequent_itemset               : FrozenSet[ str ],
                             min_conf_float                 : float, 
-                            union_length                   : int, 
                             union_support                  : int,
                             num_transactions               : int) -> None:
     
-    """This function recursively mines association rules and saves those satisfying `min_conf_float`."""
+    """
+        This function mines the association rules of a frequent itemset level by level (ap-genrules) and saves those
+        satisfying `min_conf_float`. Consequents of m + 1 items are joined from consequents of m items sharing their
+        first m - 1 items, and kept only if all their m-item subsets made confident rules: moving items from the
+        antecedent to the consequent never raises confidence, so no other consequent can make a confident rule.
+        Each consequent is generated once, so each rule is produced exactly once.
+    """
+
+    # fixed order of items, consequents are tuples of increasing item indices
+    items : tuple = tuple(frequent_itemset)
+
+    # union support count to union support ratio
+    union_support_float : float = union_support / num_transactions
+
+    # consequents of the current level whose rules satisfy minimum confidence
+    consequents : list = [  (idx, ) for idx in range(items.__len__())  ]
 
     # only consider association rules where both antecedent and consequent are non-empty
-    if ((antecedent.__len__()) and (consequent.__len__())):
+    while ((consequents.__len__()) and (consequents[0].__len__() < items.__len__())):
 
+        confident_consequents : list = []
 
-        # antecedent itemset as (index, item) dictionary
-        #_antecedent : dict = swap_dictionary_key_value(antecedent)
+        for consequent_indices in consequents:
 
-        # antecedent itemset as tuple
-        # _antecedent : tuple = tuple(
-        #     _antecedent[idx] for idx in range(union_length) 
-        #         if (idx in _antecedent)
-        # )
+            consequent : frozenset = frozenset(map(items.__getitem__, consequent_indices))
 
-        # antecedent itemset support count
-        antecedent_support : int = get_frequent_itemset_support(
-            frequent_itemsets_with_support, antecedent #_antecedent
-        )
+            antecedent : frozenset = frequent_itemset - consequent
 
+            # confidence score of association rule
+            confidence : float = union_support / get_frequent_itemset_support(frequent_itemsets_with_support, antecedent)
 
-        # confidence score of association rule
-        confidence : float = union_support / antecedent_support
+            # larger consequents containing this one are below minimum threshold as well
+            if (confidence < min_conf_float):
+                continue
 
+            confident_consequents.append(consequent_indices)
 
-        # stop adding items to antecedent if confidence is already below minimum threshold
-        if (confidence < min_conf_float):
-            return
-        
-        
-        # consequent itemset as (index, item) dictionary
-        #_consequent : dict = swap_dictionary_key_value(consequent)
-
-        # consequent itemset as tuple
-        # _consequent : tuple = tuple(
-        #     _consequent[idx] for idx in range(union_length)
-        #         if (idx in _consequent)
-        # )
-
-        # consequent itemset support count
-        consequent_support : int = get_frequent_itemset_support(
-            frequent_itemsets_with_support, consequent #_consequent
-        )
+            # conseqeunt support count to consequent support ratio
+            consequent_support_float : float = get_frequent_itemset_support(frequent_itemsets_with_support, consequent) / num_transactions
 
-        # conseqeunt support count to consequent support ratio
-        consequent_support_float : float = consequent_support / num_transactions
+            # P(ANT + CON) / ( P(ANT) * P(CON) ) = CONF(ANT + CON) / P(CON)
+            confidence_lift          : float = confidence / consequent_support_float
 
-        
-        # union support count to union support ratio
-        union_support_float      : float = union_support / num_transactions
+            # add to association rule if greater than confidence threshold
+            association_rules.append((
+                antecedent,          # antecedent 
+                consequent,          # consequent
+                union_support_float, # support (float)
+                confidence,          # confidence (float)
+                confidence_lift      # lift (float)
+            ))
 
+        # hashed index of confident consequents
+        confident_index : set = set(confident_consequents)
 
-        # P(ANT + CON) / ( P(ANT) * P(CON) ) = CONF(ANT + CON) / P(CON)
-        confidence_lift          : float = confidence / consequent_support_float
+        # confident consequents grouped by their first (m - 1) items {  prefix : [ last_index, ... ]  }
+        prefix_groups : dict = dict()
 
+        for consequent_indices in confident_consequents:
+            prefix_groups.setdefault(consequent_indices[:-1], []).append(consequent_indices[-1])
 
-        # add to association rule if greater than confidence threshold
-        association_rules.add((
-            frozenset(antecedent), # antecedent 
-            frozenset(consequent), # consequent
-            union_support_float,   # support (int)
-            confidence,            # confidence (float)
-            confidence_lift        # lift (float)
-        ))
+        consequents = []
 
+        for prefix, last_indices in prefix_groups.items():
 
-    #for item, index in list(antecedent.items()):
-    for item in antecedent.copy():
+            for i in range(last_indices.__len__() - 1):
 
-        # move item from antecedent to consequent
-        #consequent[item] = index
-        consequent.add(item)
-        #del antecedent[item]
-        antecedent.remove(item)
+                for j in range(i + 1, last_indices.__len__()):
 
-        # recursively mine association rules of frequent itemset
-        _mine_association_rules(
-            association_rules, 
-            frequent_itemsets_with_support, 
-            antecedent, 
-            consequent, 
-            min_conf_float, 
-            union_length, 
-            union_support,
-            num_transactions
-        )
+                    candidate = (*prefix, last_indices[i], last_indices[j])
 
-        # move item from consequent back to antecedent
-        #antecedent[item] = index
-        antecedent.add(item)
-        #del consequent[item]
-        consequent.remove(item)
+                    # every m-item subset must have made a confident rule (the two joined consequents already did)
+                    if all((candidate[:idx] + candidate[idx + 1:]) in confident_index for idx in range(prefix.__len__())):
+                        consequents.append(candidate)
 
 
 
@@ -150,41 +130,28 @@ def mine_association_rules(
             frequent_itemsets_with_support : Dict[ FrozenSet[ str ], int ],#Dict[ Any, Dict[ Tuple[ Any ], int ] ],
             min_conf_float                 : float,
             num_transactions               : int
-        ) -> Set[ Tuple[ FrozenSet[ Any ], FrozenSet[ Any ], float, int ] ]:
+        ) -> List[ Tuple[ FrozenSet[ Any ], FrozenSet[ Any ], float, float, float ] ]:
 
-    """Given a frequent-items dictionary, return all association rules satisfying `min_conf_float`."""
+    """Given a frequent-items dictionary, return all association rules satisfying `min_conf_float` (each exactly once)."""
 
     # set of tuples
     frequent_itemsets : set = extract_frequent_itemsets(frequent_itemsets_with_support)
 
-    # set of tuples {  Set[ Tuple[ FrozenSet, FrozenSet, float, int ] ]  }
-    association_rules : set = set()
+    # list of tuples {  List[ Tuple[ FrozenSet, FrozenSet, float, float, float ] ]  }
+    association_rules : list = list()
 
     # iterate through each frequent itemset
     for frequent_itemset in frequent_itemsets:
 
-        # (item, index) dictionary {  Dict[ Any, int ]  }
-        #antecedent : dict = itemset_tuple_to_dict(frequent_itemset)
-        antecedent : set = set(frequent_itemset)
-
-        # (item, index) dictionary {  Dict[ Any, int ]  }
-        #consequent : dict = dict()
-        consequent : set = set()
-
         # support count of frequent itemset (union of antecedent and consequent)
         union_support : int = get_frequent_itemset_support(frequent_itemsets_with_support, frequent_itemset)
 
-        # number of items in frequent itemset
-        union_length = len(antecedent)
-
-        # recursively mine association rules of frequent itemset
+        # mine association rules of frequent itemset level by level
         _mine_association_rules(
             association_rules, 
             frequent_itemsets_with_support, 
-            antecedent, 
-            consequent, 
+            frequent_itemset, 
             min_conf_float, 
-            union_length, 
             union_support,
             num_transactions
         )
@@ -218,7 +185,7 @@ if (__name__ == "__main__"):
 
     num_transactions : int = 4
 
-    association_rules : set = mine_association_rules(
+    association_rules : list = mine_association_rules(
         frequent_itemsets_with_support, 
         min_conf_float,
         num_transactions
@@ -0,0 +1,358 @@
+from typing import *
+from multiprocessing.connection import Listener, Client, wait
+from abc import ABC, abstractmethod
+import multiprocessing
+import concurrent.futures
+import os
+from utilities import count_transaction_items, compact_transactions
+import fp_growth_2
+
+"""
+    Parallel FP-Growth (PFP): transactions are split into shards and items into groups. Workers count
+    items over their shards, then map every transaction to group-dependent transactions (the prefix of the
+    transaction up to the last item of each group), and each group is mined as an independent shard with
+    `fp_growth_2`, keeping the patterns whose least frequent item belongs to the group. Tasks are run on
+    workers through a pluggable `Transport`.
+"""
+
+class Transport(ABC):
+
+    """Runs tasks (a module-level function with its arguments) on workers and returns their results in order."""
+
+    @abstractmethod
+    def map(self, function : Callable, tasks : List[ tuple ]) -> List[ Any ]:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+
+class LocalTransport(Transport):
+
+    """Workers are processes of a local process pool."""
+
+    def __init__(self, max_workers : Optional[ int ] = None) -> None:
+
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers = max_workers)
+
+    def map(self, function : Callable, tasks : List[ tuple ]) -> List[ Any ]:
+
+        futures = [  self.executor.submit(function, *task) for task in tasks  ]
+
+        return [  future.result() for future in futures  ]
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+
+
+class SocketTransport(Transport):
+
+    """
+        Workers are `serve_worker` processes, possibly on other hosts, reached through `multiprocessing.connection`
+        sockets. Each worker runs one task at a time and gets the next pending task as soon as it replies.
+        Workers run whatever function they are sent, so `authkey` must be a secret shared only with them.
+    """
+
+    def __init__(self, addresses : List[ Tuple[ str, int ] ], authkey : bytes) -> None:
+
+        # connection to each worker
+        self.connections : List[ Any ] = [  Client(address, authkey = authkey) for address in addresses  ]
+
+        # local worker processes started by `spawn`
+        self.processes   : List[ multiprocessing.Process ] = []
+
+    @classmethod
+    def spawn(cls, num_workers : int, authkey : Optional[ bytes ] = None) -> "SocketTransport":
+
+        """
+            Starts `num_workers` local socket workers (for testing on a single machine) and connects to them,
+            with a random `authkey` unless one is given.
+        """
+
+        authkey = ((authkey) if (authkey is not None) else (os.urandom(32)))
+
+        (processes, addresses) = ([], [])
+
+        for _ in range(num_workers):
+
+            (receiver, sender) = multiprocessing.Pipe(duplex = False)
+
+            # listen on a free port and report it back once ready
+            process = multiprocessing.Process(target = serve_worker, args = (("localhost", 0), authkey, sender, 1), daemon = True)
+
+            process.start()
+
+            processes.append(process)
+
+            addresses.append(receiver.recv())
+
+        transport = cls(addresses, authkey)
+
+        transport.processes = processes
+
+        return transport
+
+    def map(self, function : Callable, tasks : List[ tuple ]) -> List[ Any ]:
+
+        results = [  None  ] * tasks.__len__()
+
+        # tasks not sent yet and the task running on each busy connection
+        (pending, running) = (list(range(tasks.__len__()))[::-1], dict())
+
+        # first exception raised by a task
+        failure : Optional[ BaseException ] = None
+
+        while (pending.__len__() or running.__len__()):
+
+            # keep every idle worker busy
+            for connection in self.connections:
+
+                if (connection not in running and pending.__len__()):
+
+                    running[connection] = pending.pop()
+
+                    connection.send((function, tasks[running[connection]]))
+
+            for connection in wait(list(running)):
+
+                (succeeded, result) = connection.recv()
+
+                results[running.pop(connection)] = result
+
+                # stop sending tasks, but read the replies of running ones so that none is left for the next `map`
+                if ((not succeeded) and (failure is None)):
+
+                    failure = result
+
+                    pending.clear()
+
+        if (failure is not None):
+            raise failure
+
+        return results
+
+    def close(self) -> None:
+
+        # tell workers that the session is over
+        for connection in self.connections:
+
+            connection.send(None)
+
+            connection.close()
+
+        for process in self.processes:
+            process.join()
+
+        (self.connections, self.processes) = ([], [])
+
+
+
+def serve_worker(address  : Tuple[ str, int ],
+                 authkey  : bytes,
+                 ready    : Optional[ Any ] = None,
+                 sessions : Optional[ int ] = None
+            ) -> None:
+
+    """
+        Socket worker: accepts `SocketTransport` sessions on `address` (forever, or `sessions` times) and runs the
+        tasks it receives, so `authkey` must be a secret shared only with trusted clients. `ready` is an optional
+        connection to which the bound address is sent once listening.
+    """
+
+    with Listener(address, authkey = authkey) as listener:
+
+        if (ready is not None):
+            ready.send(listener.address)
+
+        while (sessions is None or sessions > 0):
+
+            with listener.accept() as connection:
+
+                while (True):
+
+                    message = connection.recv()
+
+                    # end of session
+                    if (message is None):
+                        break
+
+                    (function, args) = message
+
+                    try:
+                        connection.send((True, function(*args)))
+                    except Exception as exception:
+                        connection.send((False, exception))
+
+            if (sessions is not None):
+                sessions -= 1
+
+
+
+def count_shard(shard : List[ List[ Union[ int, str ] ] ]) -> Dict[ str, int ]:
+
+    """Task: occurrences of each item in a shard of transactions."""
+
+    return count_transaction_items(shard)
+
+
+
+def group_shard(shard       : List[ List[ Union[ int, str ] ] ],
+                ranks       : Dict[ str, int ],
+                item_groups : Dict[ str, int ]
+            ) -> Dict[ int, List[ List[ Union[ int, str ] ] ] ]:
+
+    """
+        Task (mapper): group-dependent transactions of a shard {  group : [ [ count, item1, ... ], ... ]  }. Each
+        transaction, with its frequent items sorted by rank, sends to every group its prefix ending at the last
+        item of that group, so that a group alone holds all the pattern bases of its items.
+    """
+
+    group_transactions = dict()
+
+    for transaction in shard:
+
+        (weight, items) = ((transaction[0], transaction[1:]) if (transaction.__len__() and isinstance(transaction[0], int)) else (1, transaction))
+
+        # frequent items in non-increasing order by occurrences
+        items = sorted(set(filter(ranks.__contains__, items)), key = ranks.__getitem__)
+
+        # groups already holding a longer prefix of this transaction
+        sent_groups = set()
+
+        for idx in range(items.__len__() - 1, -1, -1):
+
+            group = item_groups[items[idx]]
+
+            if (group in sent_groups):
+                continue
+
+            sent_groups.add(group)
+
+            group_transactions.setdefault(group, []).append([ weight, *items[0 : idx + 1] ])
+
+    return group_transactions
+
+
+
+def mine_group(group_items  : List[ str ],
+               transactions : List[ List[ Union[ int, str ] ] ],
+               min_sup_int  : int
+            ) -> Dict[ FrozenSet[ str ], int ]:
+
+    """Task (reducer): builds the FP-Tree of a group shard and mines the patterns ending with the items of the group."""
+
+    # merge group-dependent transactions that are identical
+    transactions : list = compact_transactions(transactions)[0]
+
+    fp_headers = fp_growth_2.construct_tree(transactions)[1]
+
+    return fp_growth_2.mine_patterns(fp_headers, min_sup_int, items = group_items)
+
+
+
+def mine_frequent_patterns(transactions : List[ List[ str ] ],
+                           min_sup_int  : int,
+                           transport    : Optional[ Transport ] = None,
+                           num_shards   : int = 4,
+                           num_groups   : Optional[ int ] = None
+            ) -> Tuple[ Dict[ FrozenSet[ str ], int ], Dict[ str, int ] ]:
+
+    """
+        Mines frequent patterns with PFP over `num_shards` shards of transactions and `num_groups` item groups
+        (by default twice the number of shards), on the workers of `transport` (a local process pool if none).
+    """
+
+    own_transport = (transport is None)
+
+    if (own_transport):
+        transport = LocalTransport()
+
+    try:
+
+        # split transactions into contiguous shards
+        shard_size = max((transactions.__len__() + num_shards - 1) // num_shards, 1)
+
+        shards     = [  transactions[start : start + shard_size] for start in range(0, transactions.__len__(), shard_size)  ]
+
+        """
+            1. Parallel counting and the list of frequent items (F-list)
+        """
+
+        occurrences = dict()
+
+        for shard_occurrences in transport.map(count_shard, [  (shard,) for shard in shards  ]):
+
+            for item, count in shard_occurrences.items():
+                occurrences[item] = occurrences.get(item, 0) + count
+
+        frequent_items = sorted(filter(lambda x : occurrences[x] >= min_sup_int, occurrences), key = lambda x : (-occurrences[x], x))
+
+        ranks = {  item : rank for rank, item in enumerate(frequent_items)  }
+
+        """
+            2. Grouping: items are dealt round-robin along the F-list, so that every group gets a similar mix of frequent and rare items
+        """
+
+        num_groups  = ((num_groups) if (num_groups is not None) else (2 * num_shards))
+
+        item_groups = {  item : (rank % num_groups) for item, rank in ranks.items()  }
+
+        """
+            3. Group-dependent transactions (map), shuffled to their groups
+        """
+
+        group_transactions = dict()
+
+        for shard_groups in transport.map(group_shard, [  (shard, ranks, item_groups) for shard in shards  ]):
+
+            for group, group_shard_transactions in shard_groups.items():
+                group_transactions.setdefault(group, []).extend(group_shard_transactions)
+
+        """
+            4. Mining each group shard (reduce) and aggregation of the results
+        """
+
+        # largest group shards first
+        groups = sorted(group_transactions, key = lambda x : -group_transactions[x].__len__())
+
+        frequent_patterns = dict()
+
+        for group_patterns in transport.map(mine_group, [
+            ([  item for item in frequent_items if (item_groups[item] == group)  ], group_transactions[group], min_sup_int) for group in groups
+        ]):
+            frequent_patterns.update(group_patterns)
+
+    finally:
+
+        if (own_transport):
+            transport.close()
+
+    # frequent patterns (dict) and occurrences of each distinct item (dict)
+    return (frequent_patterns, occurrences)
+
+
+
+if (__name__ == "__main__"):
+
+    transactions = [
+        [ '9192', '31651', '45874' ],
+        [ '57515', '45874' ],
+        [ '45874', '9192' ],
+        [ '31651' ]
+    ]
+
+    min_sup_int = 1
+
+    with SocketTransport.spawn(2) as transport:
+
+        frequent_patterns, occurrences = mine_frequent_patterns(transactions, min_sup_int, transport, num_shards = 2)
+
+    print(frequent_patterns, occurrences)
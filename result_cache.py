@@ -0,0 +1,236 @@
+from typing import *
+import hashlib
+import pickle
+import time
+import os
+
+"""
+    Persistent cache of mining results keyed by (dataset fingerprint, engine, minimum support). All frequent (or all
+    closed) patterns at a higher threshold are a subset of those at a lower one, so for engines returning such
+    results a request is also answered by filtering the cached result of the same dataset and engine with the
+    closest lower threshold. Other results (e.g. maximal patterns) are only reused at the exact same threshold.
+"""
+
+def dataset_fingerprint(transactions : List[ List[ Union[ int, str ] ] ]) -> str:
+
+    """Fingerprint of the content of a list of transactions (compute it before mining, engines may reorder rows in place)."""
+
+    digest = hashlib.sha1()
+
+    for transaction in transactions:
+        digest.update(pickle.dumps(transaction, protocol = 4))
+
+    return digest.hexdigest()
+
+
+
+class ResultCache(object):
+
+    """
+        Results stored as one pickle file per entry in `directory`, with an index of every entry (key, size in bytes,
+        last use). Least recently used entries are evicted once the entries exceed `max_bytes` in total.
+    """
+
+    def __init__(self, directory : str, max_bytes : int = 1 << 30) -> None:
+
+        (self.directory, self.max_bytes) = (directory, max_bytes)
+
+        os.makedirs(directory, exist_ok = True)
+
+        self.index_path = os.path.join(directory, "index.pickle")
+
+        # {  file_name : {  "fingerprint", "engine", "min_sup_int", "size", "last_used"  }  }
+        self.index : Dict[ str, Dict[ str, Any ] ] = dict()
+
+        if (os.path.exists(self.index_path)):
+
+            with open(self.index_path, mode = "rb") as rf:
+                self.index = pickle.load(rf)
+
+        # exact hits, hits answered from a lower threshold, misses and evicted entries (this instance)
+        self.statistics : Dict[ str, int ] = {  "hits" : 0, "filtered_hits" : 0, "misses" : 0, "evictions" : 0  }
+
+    def __save_index(self) -> None:
+
+        with open(self.index_path + ".tmp", mode = "wb") as wf:
+            pickle.dump(self.index, wf, protocol = pickle.HIGHEST_PROTOCOL)
+
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+    def __file_name(self, fingerprint : str, engine : str, min_sup_int : Union[ int, float ]) -> str:
+        return hashlib.sha1(repr((fingerprint, engine, min_sup_int)).encode("utf-8")).hexdigest() + ".pickle"
+
+    def get(self,
+            fingerprint : str,
+            engine      : str,
+            min_sup_int : Union[ int, float ],
+            filterable  : bool = False
+        ) -> Optional[ Tuple[ Dict[ FrozenSet[ Any ], int ], Dict[ Any, int ] ] ]:
+
+        """
+            Cached (frequent patterns, occurrences) for the key, or None if no entry can answer it. With `filterable`
+            (the engine returns all frequent or all closed patterns) an entry at a lower threshold is filtered.
+        """
+
+        # entries of the same dataset and engine at the same (or a lower, if filterable) threshold, the closest one last
+        entries = sorted(
+            (entry["min_sup_int"], file_name) for file_name, entry in self.index.items()
+                if (entry["fingerprint"] == fingerprint and entry["engine"] == engine and 
+                    ((entry["min_sup_int"] <= min_sup_int) if (filterable) else (entry["min_sup_int"] == min_sup_int)))
+        )
+
+        if (entries.__len__() == 0):
+
+            self.statistics["misses"] += 1
+
+            return None
+
+        (cached_min_sup, file_name) = entries[-1]
+
+        try:
+
+            with open(os.path.join(self.directory, file_name), mode = "rb") as rf:
+                (frequent_patterns, occurrences) = pickle.load(rf)
+
+        except (OSError, pickle.UnpicklingError, EOFError):
+
+            # entry lost or corrupt
+            self.__remove(file_name)
+
+            self.__save_index()
+
+            return self.get(fingerprint, engine, min_sup_int, filterable)
+
+        self.index[file_name]["last_used"] = time.time()
+
+        self.__save_index()
+
+        if (cached_min_sup == min_sup_int):
+
+            self.statistics["hits"] += 1
+
+            return (frequent_patterns, occurrences)
+
+        self.statistics["filtered_hits"] += 1
+
+        # patterns frequent at the requested threshold
+        return ({  itemset : support for itemset, support in frequent_patterns.items() if (support >= min_sup_int)  }, occurrences)
+
+    def put(self,
+            fingerprint : str,
+            engine      : str,
+            min_sup_int : Union[ int, float ],
+            result      : Tuple[ Dict[ FrozenSet[ Any ], int ], Dict[ Any, int ] ]
+        ) -> None:
+
+        """Store a (frequent patterns, occurrences) result, evicting least recently used entries to stay within `max_bytes`."""
+
+        file_name = self.__file_name(fingerprint, engine, min_sup_int)
+
+        data = pickle.dumps(result, protocol = pickle.HIGHEST_PROTOCOL)
+
+        with open(os.path.join(self.directory, file_name), mode = "wb") as wf:
+            wf.write(data)
+
+        self.index[file_name] = {
+            "fingerprint" : fingerprint,
+            "engine"      : engine,
+            "min_sup_int" : min_sup_int,
+            "size"        : data.__len__(),
+            "last_used"   : time.time()
+        }
+
+        # least recently used first
+        for file_name in sorted(self.index, key = lambda x : self.index[x]["last_used"]):
+
+            if (self.size() <= self.max_bytes):
+                break
+
+            self.__remove(file_name)
+
+            self.statistics["evictions"] += 1
+
+        self.__save_index()
+
+    def __remove(self, file_name : str) -> None:
+
+        self.index.pop(file_name)
+
+        try:
+            os.remove(os.path.join(self.directory, file_name))
+        except FileNotFoundError:
+            pass
+
+    def size(self) -> int:
+
+        """Total size of the cached entries in bytes."""
+
+        return sum(entry["size"] for entry in self.index.values())
+
+    def clear(self) -> None:
+
+        for file_name in list(self.index):
+            self.__remove(file_name)
+
+        self.__save_index()
+
+    def mine_frequent_patterns(self,
+                               mine_frequent_patterns : Callable,
+                               transactions           : List[ List[ Union[ int, str ] ] ],
+                               min_sup_int            : Union[ int, float ],
+                               fingerprint            : Optional[ str ] = None,
+                               filterable             : bool = False,
+                               engine_name            : Optional[ str ] = None
+            ) -> Tuple[ Dict[ FrozenSet[ Any ], int ], Dict[ Any, int ] ]:
+
+        """
+            Result of `mine_frequent_patterns(transactions, min_sup_int)` from the cache, mining (and caching) it on a miss.
+            The engine is identified by `engine_name` (by default its qualified name, which is only unique for
+            module-level functions, so lambdas, closures and partials must be named), the dataset by `fingerprint`
+            (by default that of `transactions`). Set `filterable` for engines returning all frequent or all closed
+            patterns, so that lower-threshold results can answer the request (see `get`).
+        """
+
+        fingerprint = ((fingerprint) if (fingerprint is not None) else (dataset_fingerprint(transactions)))
+
+        engine = engine_name
+
+        if (engine is None):
+
+            qualname = getattr(mine_frequent_patterns, "__qualname__", None)
+
+            # distinct lambdas or closures share a qualified name, and would be served each other's results
+            if ((qualname is None) or ("<lambda>" in qualname) or ("<locals>" in qualname)):
+                raise ValueError("{!r} has no unique qualified name, pass engine_name".format(mine_frequent_patterns))
+
+            engine = f"{mine_frequent_patterns.__module__}.{qualname}"
+
+        result = self.get(fingerprint, engine, min_sup_int, filterable)
+
+        if (result is None):
+
+            result = mine_frequent_patterns(transactions, min_sup_int)
+
+            self.put(fingerprint, engine, min_sup_int, result)
+
+        return result
+
+
+
+if (__name__ == "__main__"):
+
+    from eclat import mine_frequent_patterns
+
+    transactions = [
+        [ '9192', '31651', '45874' ],
+        [ '57515', '45874' ],
+        [ '45874', '9192' ],
+        [ '31651' ]
+    ]
+
+    result_cache = ResultCache(".result_cache")
+
+    for min_sup_int in (1, 2, 2):
+        print(result_cache.mine_frequent_patterns(mine_frequent_patterns, transactions, min_sup_int, filterable = True))
+
+    print(result_cache.statistics)
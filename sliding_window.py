@@ -0,0 +1,144 @@
+from typing import *
+from collections import deque
+from fp_growth_2 import FPTree, HEADER_OCCU, insert_transactions, mine_patterns
+
+class SlidingWindowMiner(object):
+
+    """
+        Frequent itemsets over the most recent `window_size` transactions of a stream, on a CanTree: an FP-Tree whose
+        transactions are sorted in a canonical order (the order in which items were first seen) instead of by
+        occurrences, so that it never needs restructuring. Arriving transactions are inserted, expired ones are
+        subtracted along their path, and the patterns of the current window are mined on demand. Nodes whose count
+        dropped to zero are reused by later transactions, and the tree is rebuilt from the window once they make up
+        more than half of its nodes.
+    """
+
+    def __init__(self, window_size : int) -> None:
+
+        # maximum number of transactions in the window
+        self.window_size : int = window_size
+
+        # canonical weighted transactions [ count, item1, item2, ... ] of the window, oldest first
+        self.window : Deque[ List[ Union[ int, str ] ] ] = deque()
+
+        self.fp_tree : FPTree = FPTree()
+
+        # number of nodes whose count is zero
+        self.num_empty_nodes : int = 0
+
+    def __canonical_transaction(self, transaction : List[ Union[ int, str ] ]) -> List[ Union[ int, str ] ]:
+
+        """Weighted transaction with its distinct items sorted by item code (codes are assigned to unseen items first)."""
+
+        (weight, items) = ((transaction[0], transaction[1:]) if (isinstance(transaction[0], int)) else (1, transaction))
+
+        return [ weight, *sorted(set(items), key = self.fp_tree.item_code) ]
+
+    def __remove_transaction(self, transaction : List[ Union[ int, str ] ]) -> None:
+
+        """Subtracts the count of a canonical transaction along its path in the tree."""
+
+        (fp_tree, weight) = (self.fp_tree, transaction[0])
+
+        cur_node = FPTree.ROOT_NODE
+
+        for idx in range(1, transaction.__len__()):
+
+            cur_node = fp_tree.child(cur_node, fp_tree.codes[transaction[idx]])
+
+            fp_tree.counts[cur_node] -= weight
+
+            fp_tree.headers[transaction[idx]][HEADER_OCCU] -= weight
+
+            if (fp_tree.counts[cur_node] == 0):
+                self.num_empty_nodes += 1
+
+    def __rebuild(self) -> None:
+
+        """Rebuilds the tree from the transactions of the window, keeping the canonical item codes."""
+
+        fp_tree = FPTree()
+
+        (fp_tree.labels, fp_tree.codes) = (self.fp_tree.labels, self.fp_tree.codes)
+
+        self.fp_tree = insert_transactions(fp_tree, self.window)
+
+        self.num_empty_nodes = 0
+
+    def add(self, transaction : List[ Union[ int, str ] ]) -> None:
+
+        """Adds a transaction (plain or weighted) to the window, expiring the oldest ones beyond `window_size`."""
+
+        if (transaction.__len__() == 0):
+            return
+
+        transaction = self.__canonical_transaction(transaction)
+
+        # reused nodes of the path whose count was zero
+        cur_node = FPTree.ROOT_NODE
+
+        for idx in range(1, transaction.__len__()):
+
+            cur_node = self.fp_tree.child(cur_node, self.fp_tree.codes[transaction[idx]])
+
+            if (cur_node == FPTree.NULL_NODE):
+                break
+
+            if (self.fp_tree.counts[cur_node] == 0):
+                self.num_empty_nodes -= 1
+
+        insert_transactions(self.fp_tree, [ transaction ])
+
+        self.window.append(transaction)
+
+        while (self.window.__len__() > self.window_size):
+            self.__remove_transaction(self.window.popleft())
+
+        if (self.num_empty_nodes > (self.fp_tree.__len__() >> 1)):
+            self.__rebuild()
+
+    def extend(self, transactions : Iterable[ List[ Union[ int, str ] ] ]) -> None:
+
+        """Adds transactions in arrival order."""
+
+        for transaction in transactions:
+            self.add(transaction)
+
+    def __len__(self) -> int:
+
+        """Number of transactions in the window."""
+        return self.window.__len__()
+
+    def mine_frequent_patterns(self, min_sup_int : int) -> Tuple[ Dict[ FrozenSet[ str ], int ], Dict[ str, int ] ]:
+
+        """Frequent patterns of the current window and the occurrences of each item in it."""
+
+        headers = self.fp_tree.headers
+
+        occurrences = {  item : header[HEADER_OCCU] for item, header in headers.items() if (header[HEADER_OCCU] > 0)  }
+
+        # infrequent header items are never mined
+        frequent_items = [  item for item, count in occurrences.items() if (count >= min_sup_int)  ]
+
+        return (mine_patterns(headers, min_sup_int, items = frequent_items), occurrences)
+
+
+
+if (__name__ == "__main__"):
+
+    transactions = [
+        [ '9192', '31651', '45874' ],
+        [ '57515', '45874' ],
+        [ '45874', '9192' ],
+        [ '31651' ]
+    ]
+
+    min_sup_int = 1
+
+    sliding_window = SlidingWindowMiner(window_size = 2)
+
+    for transaction in transactions:
+
+        sliding_window.add(transaction)
+
+        print(sliding_window.mine_frequent_patterns(min_sup_int))
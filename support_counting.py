@@ -0,0 +1,310 @@
+from typing import *
+import multiprocessing
+from transaction_store import StoreHandle, TransactionStore
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# number of 64-bit words gathered at once while counting a candidate level (bounds temporary memory)
+MAX_BATCH_WORDS = 1 << 22
+
+class BitmapDatabase(object):
+
+    """
+        Transaction database stored as a packed uint64 bitmap per item (bit `tid` of row `item` is set
+        when transaction `tid` contains the item), used to count a whole level of candidates at once
+        with vectorized AND and popcount. Requires NumPy.
+    """
+
+    def __init__(self, transactions : List[ Tuple[ int, Set[ Union[ int, str ] ] ] ]) -> None:
+
+        # row of each item in bitmap matrix
+        self.item_rows    : Dict[ Union[ int, str ], int ] = dict()
+
+        # number of 64-bit words per bitmap
+        self.num_words    : int = max((transactions.__len__() + 63) // 64, 1)
+
+        (item_indices, tids, weights) = ([], [], [])
+
+        for tid, (weight, transaction) in enumerate(transactions):
+
+            weights.append(weight)
+
+            for item in transaction:
+
+                item_indices.append(self.item_rows.setdefault(item, self.item_rows.__len__()))
+
+                tids.append(tid)
+
+        (item_indices, tids) = (np.asarray(item_indices, dtype = np.int64), np.asarray(tids, dtype = np.int64))
+
+        # bitmap of each item (one extra all-zero row for items that never occur)
+        self.bitmaps      : np.ndarray = np.zeros((self.item_rows.__len__() + 1, self.num_words), dtype = np.uint64)
+
+        np.bitwise_or.at(self.bitmaps, (item_indices, tids >> 6), np.left_shift(np.uint64(1), (tids & 63).astype(np.uint64)))
+
+        # bitmap of transactions whose count has bit b set {  2 ** b : bitmap  }, so that counting costs
+        # one AND and popcount per bit of the largest count rather than per distinct count
+        self.weight_masks : Dict[ int, np.ndarray ] = dict()
+
+        weights = np.asarray(weights, dtype = np.int64)
+
+        for bit in range(((int(weights.max())) if (weights.size) else (0)).bit_length()):
+
+            weight_tids = np.flatnonzero((weights >> bit) & 1)
+
+            # no transaction count has this bit set
+            if (weight_tids.size == 0):
+                continue
+
+            weight_mask = np.zeros(self.num_words, dtype = np.uint64)
+
+            np.bitwise_or.at(weight_mask, weight_tids >> 6, np.left_shift(np.uint64(1), (weight_tids & 63).astype(np.uint64)))
+
+            self.weight_masks[1 << bit] = weight_mask
+
+    def __count_bits(self, bitmaps : "np.ndarray") -> "np.ndarray":
+
+        """Number of set bits in each row of a uint64 matrix."""
+        if (hasattr(np, "bitwise_count")):
+            return np.bitwise_count(bitmaps).sum(axis = 1, dtype = np.int64)
+
+        return np.unpackbits(bitmaps.view(np.uint8), axis = 1).sum(axis = 1, dtype = np.int64)
+
+    def count_supports(self, candidates : List[ Iterable[ Union[ int, str ] ] ]) -> List[ int ]:
+
+        """Given a level of candidates (all of the same length), find the support count of each candidate."""
+
+        candidates = [  list(candidate) for candidate in candidates  ]
+
+        if (candidates.__len__() == 0):
+            return []
+
+        # rows of candidate items (items that never occur point to the all-zero row)
+        missing_row = self.item_rows.__len__()
+
+        candidate_rows = np.asarray([
+            [  self.item_rows.get(item, missing_row) for item in candidate  ] for candidate in candidates
+        ], dtype = np.int64)
+
+        # candidates per batch, so that gathered bitmaps stay within `MAX_BATCH_WORDS`
+        batch_size = max(MAX_BATCH_WORDS // (candidate_rows.shape[1] * self.num_words), 1)
+
+        supports = np.zeros(candidates.__len__(), dtype = np.int64)
+
+        for start in range(0, candidates.__len__(), batch_size):
+
+            # AND the bitmaps of the items of each candidate => (batch, num_words)
+            joined = np.bitwise_and.reduce(self.bitmaps[candidate_rows[start : start + batch_size]], axis = 1)
+
+            # all transactions share the same count (a single bit plane holds every transaction)
+            if (self.weight_masks.__len__() == 1):
+
+                supports[start : start + batch_size] = next(iter(self.weight_masks)) * self.__count_bits(joined)
+
+                continue
+
+            # total count of transactions containing each candidate, summed over bit planes
+            for weight, weight_mask in self.weight_masks.items():
+                supports[start : start + batch_size] += weight * self.__count_bits(joined & weight_mask)
+
+        return supports.tolist()
+
+
+
+class CandidateTrie(object):
+
+    """
+        Prefix trie over a level of candidates (all of the same length), used to count every candidate
+        with a single scan of the transactions: each transaction walks the trie once and increments
+        every candidate it contains.
+    """
+
+    def __init__(self, candidates : List[ Iterable[ Union[ int, str ] ] ]) -> None:
+
+        candidates = [  list(candidate) for candidate in candidates  ]
+
+        # length of candidates
+        self.length : int = ((candidates[0].__len__()) if (candidates.__len__()) else (0))
+
+        # number of candidates
+        self.num_candidates : int = candidates.__len__()
+
+        # rank of each candidate item, items of candidates and transactions are walked in this order
+        self.ranks  : Dict[ Union[ int, str ], int ] = dict()
+
+        for candidate in candidates:
+            for item in candidate:
+                self.ranks.setdefault(item, self.ranks.__len__())
+
+        # nested dictionaries {  item : {  item : ... {  item : candidate_index  }  }  }
+        self.root   : dict = dict()
+
+        for candidate_index, candidate in enumerate(candidates):
+
+            candidate.sort(key = self.ranks.__getitem__)
+
+            cur_node = self.root
+
+            for item in candidate[:-1]:
+                cur_node = cur_node.setdefault(item, dict())
+
+            cur_node[candidate[-1]] = candidate_index
+
+    def __count(self, cur_node : dict, items : List[ Union[ int, str ] ], start : int, depth_left : int, weight : int, counts : List[ int ]) -> None:
+
+        """Increments every candidate below `cur_node` contained in `items[start:]`."""
+
+        # last level maps items to candidate indices
+        if (depth_left == 1):
+
+            for idx in range(start, items.__len__()):
+
+                candidate_index = cur_node.get(items[idx])
+
+                if (candidate_index is not None):
+                    counts[candidate_index] += weight
+
+            return
+
+        # leave enough items to complete a candidate
+        for idx in range(start, items.__len__() - depth_left + 1):
+
+            child_node = cur_node.get(items[idx])
+
+            if (child_node is not None):
+                self.__count(child_node, items, idx + 1, depth_left - 1, weight, counts)
+
+    def count_supports(self, transactions : List[ Tuple[ int, Set[ Union[ int, str ] ] ] ]) -> List[ int ]:
+
+        """Given (count, item set) transactions, find the support count of each candidate in one scan."""
+
+        counts = [  0  ] * self.num_candidates
+
+        if (self.num_candidates == 0):
+            return counts
+
+        for weight, transaction in transactions:
+
+            # items of transaction appearing in any candidate, in rank order
+            items = sorted(filter(self.ranks.__contains__, transaction), key = self.ranks.__getitem__)
+
+            if (items.__len__() >= self.length):
+                self.__count(self.root, items, 0, self.length, weight, counts)
+
+        return counts
+
+
+
+class PartitionedCounter(object):
+
+    """
+        Count distribution over persistent worker processes: each worker attaches read-only to a shared-memory
+        `TransactionStore` and counts every candidate level over its own tid range (with packed bitmaps when NumPy
+        is available, else with a candidate trie), and the local counts are summed. Only the store handle,
+        candidates and counts cross processes, the transactions are never serialized.
+    """
+
+    def __init__(self, store : TransactionStore, num_workers : int) -> None:
+
+        # item code of each item label of the store
+        self.item_codes : Dict[ Union[ int, str ], int ] = {  label : code for code, label in enumerate(store.item_labels)  }
+
+        # contiguous tid range of each worker
+        partition_size = max((store.__len__() + num_workers - 1) // num_workers, 1)
+
+        # connection and process of each worker
+        (self.connections, self.processes) = ([], [])
+
+        for start in range(0, store.__len__(), partition_size):
+
+            (connection, worker_connection) = multiprocessing.Pipe()
+
+            process = multiprocessing.Process(
+                target = count_partition, args = (worker_connection, store.handle, start, start + partition_size), daemon = True
+            )
+
+            process.start()
+
+            self.connections.append(connection)
+
+            self.processes.append(process)
+
+    def count_supports(self, candidates : List[ Iterable[ Union[ int, str ] ] ]) -> List[ int ]:
+
+        """Given a level of candidates (all of the same length), find the support count of each candidate over all partitions."""
+
+        # candidates as item codes of the store
+        candidates = [  [ self.item_codes[item] for item in candidate ] for candidate in candidates  ]
+
+        supports = [  0  ] * candidates.__len__()
+
+        if (candidates.__len__() == 0):
+            return supports
+
+        # every worker counts the whole level on its partition
+        for connection in self.connections:
+            connection.send(candidates)
+
+        for connection in self.connections:
+
+            for idx, count in enumerate(connection.recv()):
+                supports[idx] += count
+
+        return supports
+
+    def close(self) -> None:
+
+        for connection in self.connections:
+
+            connection.send(None)
+
+            connection.close()
+
+        for process in self.processes:
+            process.join()
+
+        (self.connections, self.processes) = ([], [])
+
+    def __enter__(self) -> "PartitionedCounter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+
+def count_partition(connection : Any, handle : StoreHandle, start : int, stop : int) -> None:
+
+    """Worker of `PartitionedCounter`: replies to every candidate level with its counts over the tid range [start, stop) of the store, until sent None."""
+
+    store = TransactionStore.attach(handle)
+
+    stop = min(stop, store.__len__())
+
+    def partition() -> Iterator[ Tuple[ int, Set[ int ] ] ]:
+
+        # (count, item set) pairs read from the store on each scan
+        for tid in range(start, stop):
+            yield (store.weights[tid], set(store.items[store.offsets[tid] : store.offsets[tid + 1]]))
+
+    # packed bitmaps of the partition, built once for all levels
+    bitmap_database = ((BitmapDatabase(list(partition()))) if (np is not None) else (None))
+
+    while (True):
+
+        candidates = connection.recv()
+
+        if (candidates is None):
+            break
+
+        if (bitmap_database is not None):
+            connection.send(bitmap_database.count_supports(candidates))
+        else:
+            connection.send(CandidateTrie(candidates).count_supports(partition()))
+
+    connection.close()
+
+    store.close()
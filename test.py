@@ -1,8 +1,11 @@
-from utilities import load_file, preprocess_transactions, post_process_mined_rules
+from utilities import post_process_mined_rules
+from utilities import compact_transactions, decode_occurrences, decode_association_rules
+from transaction_cache import open_transaction_cache
 #from fp_growth_2 import mine_frequent_patterns
 #from apriori import mine_frequent_patterns
 #from apriori_2 import mine_frequent_patterns
 from apriori_3 import mine_frequent_patterns
+#from eclat import mine_frequent_patterns
 from mine_asso_rules import mine_association_rules
 import datetime
 #import pickle
@@ -15,13 +18,13 @@ if (__name__ == "__main__"):
 
     filename = "test_data/ibm-2023-released.txt"
 
-    input_data = load_file(filename)
+    # encoded transactions mapped from the binary cache (rebuilt whenever the source file changes)
+    with open_transaction_cache(filename) as cache:
 
-    transactions = preprocess_transactions(input_data)
+        max_transactions = min(max_transactions, len(cache))
 
-    max_transactions = min(max_transactions, len(transactions))
-
-    transactions[:] = transactions[:max_transactions]
+        # mine on dense integer codes and decode only the final rules
+        (transactions, item_labels) = (cache.transactions(max_transactions), cache.item_labels)
 
     min_sup_float = 0.05
 
@@ -31,6 +34,11 @@ if (__name__ == "__main__"):
 
     print("MIN SUP INT:", min_sup_int)
 
+    # merge identical baskets into unique weighted rows
+    transactions, compaction_ratio = compact_transactions(transactions)
+
+    print("COMPACTION RATIO:", compaction_ratio)
+
     min_conf_float = 0.05
 
     frequent_patterns, occurrences = mine_frequent_patterns(transactions, min_sup_int)
@@ -55,6 +63,10 @@ if (__name__ == "__main__"):
 
     association_rules = mine_association_rules(frequent_patterns, min_conf_float, max_transactions)
 
+    association_rules = decode_association_rules(association_rules, item_labels)
+
+    occurrences = decode_occurrences(occurrences, item_labels)
+
     post_processed = post_process_mined_rules(occurrences, association_rules, min_conf_float, max_transactions)
 
     print(len(association_rules))
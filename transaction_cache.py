@@ -0,0 +1,222 @@
+from typing import *
+from array import array
+import struct
+import mmap
+import os
+from utilities import TransactionStream
+
+"""
+    Binary cache of the encoded transaction database of a `customer tid item` file, opened with `mmap`.
+
+    Layout (little-endian):
+
+        header       : magic, source size, source mtime (ns), transactions n, entries m, items k, labels size
+        occurrences  : int64 x k, occurrences of each item code
+        offsets      : int64 x (n + 1), items of transaction `t` are `items[offsets[t] : offsets[t + 1]]`
+        items        : int32 x m, item codes (ranked by frequency as in `encode_transactions`)
+        labels       : utf-8 item labels separated by newlines (`item_labels[code]`)
+"""
+
+# magic number (format version included)
+CACHE_MAGIC = b"FPTXC001"
+
+# header fields after the magic number
+CACHE_HEADER = struct.Struct("<8s6q")
+
+# sections start at a fixed, aligned position
+CACHE_HEADER_SIZE = 64
+
+# items written per batch while building
+WRITE_BATCH_ITEMS = 1 << 16
+
+
+
+def source_fingerprint(source : str) -> Tuple[ int, int ]:
+
+    """Fingerprint of a source file (size and modification time), the cache is stale once it changes."""
+
+    status = os.stat(source)
+
+    return (status.st_size, status.st_mtime_ns)
+
+
+
+def build_transaction_cache(source : str, cache_path : str) -> None:
+
+    """Parse `source` (streaming, two passes, see `stream_transactions`) and write its encoded database to `cache_path`."""
+
+    transactions = TransactionStream(source)
+
+    fingerprint  = source_fingerprint(source)
+
+    # first pass: occurrences, number of transactions and of entries
+    (occurrences, num_transactions, num_entries) = (dict(), 0, 0)
+
+    for transaction in transactions:
+
+        for item in transaction:
+            occurrences[item] = occurrences.get(item, 0) + 1
+
+        (num_transactions, num_entries) = (num_transactions + 1, num_entries + transaction.__len__())
+
+    # most frequent items first, ties broken by label (same codes as `encode_transactions`)
+    item_labels = sorted(occurrences, key = lambda x : (-occurrences[x], x))
+
+    item_codes  = {  label : code for code, label in enumerate(item_labels)  }
+
+    labels      = "\n".join(item_labels).encode("utf-8")
+
+    items_start = CACHE_HEADER_SIZE + 8 * (item_labels.__len__() + num_transactions + 1)
+
+    # written to a temporary file first, so that a cache is never left half written
+    temp_path = cache_path + ".tmp"
+
+    with open(temp_path, mode = "wb") as wf:
+
+        wf.seek(items_start)
+
+        # second pass: item codes of each transaction, in ascending order
+        (offsets, batch) = (array('q', [ 0 ]), array('i'))
+
+        for transaction in transactions:
+
+            batch.extend(sorted(map(item_codes.__getitem__, transaction)))
+
+            offsets.append(offsets[-1] + transaction.__len__())
+
+            if (batch.__len__() >= WRITE_BATCH_ITEMS):
+
+                wf.write(batch.tobytes())
+
+                batch = array('i')
+
+        wf.write(batch.tobytes())
+
+        wf.write(labels)
+
+        wf.seek(0)
+
+        wf.write(CACHE_HEADER.pack(CACHE_MAGIC, *fingerprint, num_transactions, num_entries, item_labels.__len__(), labels.__len__()).ljust(CACHE_HEADER_SIZE, b"\0"))
+
+        wf.write(array('q', map(occurrences.__getitem__, item_labels)).tobytes())
+
+        wf.write(offsets.tobytes())
+
+    os.replace(temp_path, cache_path)
+
+
+
+class TransactionCache(object):
+
+    """
+        Encoded transaction database mapped from a cache file: `occurrences`, `offsets` and `items` are read-only
+        views over the mapped file, so opening costs nothing beyond reading the header and item labels.
+    """
+
+    def __init__(self, cache_path : str) -> None:
+
+        with open(cache_path, mode = "rb") as rf:
+            self.buffer = mmap.mmap(rf.fileno(), 0, access = mmap.ACCESS_READ)
+
+        (magic, source_size, source_mtime, self.num_transactions, self.num_entries, num_items, labels_size) = CACHE_HEADER.unpack_from(self.buffer)
+
+        if (magic != CACHE_MAGIC):
+
+            self.buffer.close()
+
+            raise ValueError("{} is not a transaction cache".format(cache_path))
+
+        # fingerprint of the source file the cache was built from
+        self.fingerprint : Tuple[ int, int ] = (source_size, source_mtime)
+
+        (offsets_start, items_start) = (CACHE_HEADER_SIZE + 8 * num_items, CACHE_HEADER_SIZE + 8 * (num_items + self.num_transactions + 1))
+
+        labels_start = items_start + 4 * self.num_entries
+
+        # a truncated (or padded) file does not hold the sections its header describes
+        if (min(self.num_transactions, self.num_entries, num_items, labels_size) < 0 or labels_start + labels_size != self.buffer.__len__()):
+
+            self.buffer.close()
+
+            raise ValueError("{} does not match the size recorded in its header".format(cache_path))
+
+        view = memoryview(self.buffer)
+
+        self.occurrences : memoryview = view[CACHE_HEADER_SIZE : offsets_start].cast('q')
+        self.offsets     : memoryview = view[offsets_start : items_start].cast('q')
+        self.items       : memoryview = view[items_start : labels_start].cast('i')
+
+        view.release()
+
+        # labels of item codes (`item_labels[code]`)
+        labels = bytes(self.buffer[labels_start : labels_start + labels_size]).decode("utf-8")
+
+        self.item_labels : List[ str ] = ((labels.split("\n")) if (num_items) else ([]))
+
+    def __len__(self) -> int:
+        return self.num_transactions
+
+    def transactions(self, max_transactions : Optional[ int ] = None) -> List[ List[ int ] ]:
+
+        """Encoded weighted transactions [ 1, code1, code2, ... ] of the first `max_transactions` transactions (all by default)."""
+
+        num_transactions = ((self.num_transactions) if (max_transactions is None) else (min(max_transactions, self.num_transactions)))
+
+        items = self.items[0 : self.offsets[num_transactions]].tolist()
+
+        offsets = self.offsets[0 : num_transactions + 1].tolist()
+
+        return [  [ 1, *items[offsets[tid] : offsets[tid + 1]] ] for tid in range(num_transactions)  ]
+
+    def close(self) -> None:
+
+        # views must be released before the mapping can be closed
+        for view in (self.occurrences, self.offsets, self.items):
+            view.release()
+
+        self.buffer.close()
+
+    def __enter__(self) -> "TransactionCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+
+def open_transaction_cache(source : str, cache_path : Optional[ str ] = None) -> TransactionCache:
+
+    """
+        Open the cache of `source` (by default `source` + ".txcache"), building it first if it is missing, from an
+        older format, or was built from a different version of the source file.
+    """
+
+    cache_path = ((cache_path) if (cache_path is not None) else (source + ".txcache"))
+
+    if (os.path.exists(cache_path)):
+
+        try:
+
+            cache = TransactionCache(cache_path)
+
+            if (cache.fingerprint == source_fingerprint(source)):
+                return cache
+
+            cache.close()
+
+        except (ValueError, TypeError, struct.error):
+            pass
+
+    build_transaction_cache(source, cache_path)
+
+    return TransactionCache(cache_path)
+
+
+
+if (__name__ == "__main__"):
+
+    filename = "test_data/ibm-2023-released.txt"
+
+    with open_transaction_cache(filename) as cache:
+
+        print(cache.num_transactions, cache.num_entries, cache.item_labels[:5], cache.occurrences[:5].tolist())
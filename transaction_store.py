@@ -0,0 +1,318 @@
+from typing import *
+from array import array
+from multiprocessing import shared_memory
+import concurrent.futures
+import itertools
+import weakref
+import os
+from utilities import encode_transactions, decode_frequent_patterns, decode_occurrences
+import fp_growth_2
+
+# codes whose conditional databases are built (and held) at once by a mining task
+CODES_PER_SCAN = 16
+
+class StoreHandle(NamedTuple):
+
+    """Picklable reference to a `TransactionStore`, sent to worker processes in place of the transactions."""
+
+    # name of the shared memory segment
+    name             : str
+
+    # number of transactions (rows)
+    num_transactions : int
+
+    # total number of item codes over all rows
+    num_entries      : int
+
+
+
+class TransactionStore(object):
+
+    """
+        Integer-encoded transaction database held in shared memory in CSR layout: `offsets[tid]` to
+        `offsets[tid + 1]` delimit the item codes of transaction `tid` in `items`, and `weights[tid]` is its
+        count. Codes are ranked by frequency (code 0 is the most frequent item, see `encode_transactions`),
+        so every row is sorted in non-increasing order of occurrences and its frequent items are a prefix.
+
+        The process that builds the store owns the segment and unlinks it on `close()`, on leaving a `with`
+        block or when the store is garbage collected. Worker processes `attach()` to it by handle and read
+        the rows in place, without the transactions ever being serialized.
+    """
+
+    def __init__(self, transactions : Optional[ List[ List[ str ] ] ] = None, handle : Optional[ StoreHandle ] = None) -> None:
+
+        # labels of item codes, only known to the owner (`item_labels[code]`)
+        self.item_labels : List[ str ] = []
+
+        if (handle is None):
+
+            # rows [ count, code1, code2, ... ] with codes in ascending order
+            (encoded, self.item_labels) = encode_transactions(transactions)
+
+            handle = StoreHandle(None, encoded.__len__(), sum(transaction.__len__() - 1 for transaction in encoded))
+
+        # offsets, then weights (both 64-bit), then item codes (32-bit)
+        (weights_start, items_start) = (8 * (handle.num_transactions + 1), 8 * (2 * handle.num_transactions + 1))
+
+        size = items_start + 4 * handle.num_entries
+
+        # the segment is owned (and unlinked) by the process that created it
+        self.owner = (handle.name is None)
+
+        if (self.owner):
+            self.shm = shared_memory.SharedMemory(create = True, size = max(size, 1))
+        else:
+            self.shm = TransactionStore.__attach_segment(handle.name)
+
+        self.handle : StoreHandle = handle._replace(name = self.shm.name)
+
+        if (self.owner):
+
+            (offsets, weights, items) = (array('q', [ 0 ]), array('q'), array('i'))
+
+            for transaction in encoded:
+
+                weights.append(transaction[0])
+
+                items.extend(transaction[1:])
+
+                offsets.append(items.__len__())
+
+            self.shm.buf[0 : weights_start]           = offsets.tobytes()
+            self.shm.buf[weights_start : items_start] = weights.tobytes()
+            self.shm.buf[items_start : size]          = items.tobytes()
+
+        # read-only views over the segment
+        self.offsets : memoryview = self.shm.buf[0 : weights_start].toreadonly().cast('q')
+        self.weights : memoryview = self.shm.buf[weights_start : items_start].toreadonly().cast('q')
+        self.items   : memoryview = self.shm.buf[items_start : size].toreadonly().cast('i')
+
+        # release the segment even if `close()` is never called
+        self.__finalizer = weakref.finalize(self, TransactionStore.__release, self.shm, [ self.offsets, self.weights, self.items ], self.owner)
+
+    @staticmethod
+    def __release(shm : shared_memory.SharedMemory, views : List[ memoryview ], owner : bool) -> None:
+
+        # views must be released before the segment can be closed
+        for view in views:
+            view.release()
+
+        shm.close()
+
+        if (owner):
+            shm.unlink()
+
+    @staticmethod
+    def __attach_segment(name : str) -> shared_memory.SharedMemory:
+
+        # attached segments should not be tracked (and unlinked) by this process where supported
+        try:
+            return shared_memory.SharedMemory(name = name, track = False)
+        except TypeError:
+            return shared_memory.SharedMemory(name = name)
+
+    @classmethod
+    def attach(cls, handle : StoreHandle) -> "TransactionStore":
+
+        """Attaches to the store referenced by `handle` (read-only, e.g. from a worker process)."""
+
+        return cls(handle = handle)
+
+    def close(self) -> None:
+
+        """Detaches from the store; the owner also frees the shared memory segment."""
+
+        self.__finalizer()
+
+    def __enter__(self) -> "TransactionStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.handle.num_transactions
+
+    def row(self, tid : int, max_code : Optional[ int ] = None) -> List[ int ]:
+
+        """Weighted transaction [ count, code1, code2, ... ] of `tid`, keeping codes below `max_code` if given."""
+
+        codes = self.items[self.offsets[tid] : self.offsets[tid + 1]].tolist()
+
+        if (max_code is not None):
+
+            # codes are ascending, so the kept codes are a prefix of the row
+            codes = [  code for code in itertools.takewhile(max_code.__gt__, codes)  ]
+
+        return [ self.weights[tid], *codes ]
+
+    def rows(self, start : int = 0, stop : Optional[ int ] = None, max_code : Optional[ int ] = None) -> Iterator[ List[ int ] ]:
+
+        """Weighted transactions in the tid range [start, stop), see `row`."""
+
+        for tid in range(start, ((self.__len__()) if (stop is None) else (min(stop, self.__len__())))):
+            yield self.row(tid, max_code)
+
+    def __repr__(self) -> str:
+        return "TransactionStore(name={}, transactions={}, entries={})".format(*self.handle)
+
+
+
+"""
+    Worker tasks, each attaching to the store by handle (once per worker process)
+"""
+
+# stores attached by this process {  name : TransactionStore  }
+__attached_stores = dict()
+
+
+
+def attach_store(handle : StoreHandle) -> TransactionStore:
+
+    """Store referenced by `handle`, attached once per process and reused by later tasks."""
+
+    if (handle.name not in __attached_stores):
+        __attached_stores[handle.name] = TransactionStore.attach(handle)
+
+    return __attached_stores[handle.name]
+
+
+
+def count_items(handle : StoreHandle, start : int, stop : int) -> Dict[ int, int ]:
+
+    """Worker task: occurrences of each item code in the tid range [start, stop)."""
+
+    store = attach_store(handle)
+
+    occurrences = dict()
+
+    for tid in range(start, min(stop, store.__len__())):
+
+        weight = store.weights[tid]
+
+        for code in store.items[store.offsets[tid] : store.offsets[tid + 1]]:
+            occurrences[code] = occurrences.get(code, 0) + weight
+
+    return occurrences
+
+
+
+def mine_item_patterns(handle                 : StoreHandle,
+                       codes                  : List[ int ],
+                       min_sup_int            : int,
+                       mine_frequent_patterns : Callable = fp_growth_2.mine_frequent_patterns
+            ) -> Dict[ FrozenSet[ int ], int ]:
+
+    """
+        Worker task: mines every frequent pattern whose least frequent item is one of `codes`. The conditional
+        database of code `c` (rows containing `c`, cut to the more frequent codes before it) is read from the
+        store and mined with any engine taking weighted transactions, e.g. the FP-tree of `fp_growth_2` or the
+        vertical database of `eclat`. Codes are handled `CODES_PER_SCAN` at a time (one scan of the store per
+        batch), so only the conditional databases of one batch are ever held in memory.
+    """
+
+    store = attach_store(handle)
+
+    frequent_patterns = dict()
+
+    for batch_start in range(0, codes.__len__(), CODES_PER_SCAN):
+
+        # rows before each code of the batch {  code : [ [ count, code1, ... ], ... ]  }
+        conditional_databases = {  code : [] for code in codes[batch_start : batch_start + CODES_PER_SCAN]  }
+
+        # codes beyond the largest code of the batch never start a conditional database
+        max_code = max(conditional_databases) + 1
+
+        for tid in range(store.__len__()):
+
+            (weight, row) = (store.weights[tid], store.items[store.offsets[tid] : store.offsets[tid + 1]])
+
+            for idx, code in enumerate(row):
+
+                if (code >= max_code):
+                    break
+
+                # a pattern base is only needed when items precede the code
+                if (idx and code in conditional_databases):
+                    conditional_databases[code].append([ weight, *row[0 : idx] ])
+
+        for code, conditional_database in conditional_databases.items():
+
+            if (conditional_database.__len__() == 0):
+                continue
+
+            # patterns of the conditional database, each extended by the code
+            for itemset, support in mine_frequent_patterns(conditional_database, min_sup_int)[0].items():
+                frequent_patterns[itemset | {  code  }] = support
+
+        # free the conditional databases of the batch before building the next ones
+        conditional_databases.clear()
+
+    return frequent_patterns
+
+
+
+def mine_frequent_patterns(transactions           : List[ List[ str ] ],
+                           min_sup_int            : int,
+                           mine_frequent_patterns : Callable = fp_growth_2.mine_frequent_patterns,
+                           max_workers            : Optional[ int ] = None
+            ) -> Tuple[ Dict[ FrozenSet[ str ], int ], Dict[ str, int ] ]:
+
+    """
+        Mines frequent patterns with a process pool over a shared-memory store of `transactions`: workers
+        count item occurrences over tid ranges, then mine the conditional databases of the frequent items
+        (most frequent items first) with the given engine. Results are decoded back to item labels.
+    """
+
+    # number of worker processes (all cores by default)
+    num_workers = max_workers or os.cpu_count() or 1
+
+    with TransactionStore(transactions) as store, concurrent.futures.ProcessPoolExecutor(max_workers = num_workers) as executor:
+
+        # tid range of each counting task
+        chunk_size  = max((store.__len__() + num_workers - 1) // num_workers, 1)
+
+        occurrences = dict()
+
+        for partial_occurrences in executor.map(count_items,
+                                                itertools.repeat(store.handle),
+                                                range(0, store.__len__(), chunk_size),
+                                                range(chunk_size, store.__len__() + chunk_size, chunk_size)):
+
+            for code, count in partial_occurrences.items():
+                occurrences[code] = occurrences.get(code, 0) + count
+
+        # frequent items are the smallest codes, most frequent first
+        frequent_codes = sorted(filter(lambda x : occurrences[x] >= min_sup_int, occurrences))
+
+        frequent_patterns = {  frozenset([ code ]) : occurrences[code] for code in frequent_codes  }
+
+        # deal codes round-robin (most frequent first), so that each task gets a similar share of the work
+        code_groups = [  frequent_codes[idx :: num_workers] for idx in range(num_workers)  ]
+
+        futures = [
+            executor.submit(mine_item_patterns, store.handle, codes, min_sup_int, mine_frequent_patterns)
+                for codes in code_groups if (codes.__len__())
+        ]
+
+        for future in futures:
+            frequent_patterns.update(future.result())
+
+        return (decode_frequent_patterns(frequent_patterns, store.item_labels), decode_occurrences(occurrences, store.item_labels))
+
+
+
+if (__name__ == "__main__"):
+
+    transactions = [
+        [ '9192', '31651', '45874' ],
+        [ '57515', '45874' ],
+        [ '45874', '9192' ],
+        [ '31651' ]
+    ]
+
+    min_sup_int = 1
+
+    frequent_patterns, occurrences = mine_frequent_patterns(transactions, min_sup_int, max_workers = 2)
+
+    print(frequent_patterns, occurrences)
@@ -1,6 +1,13 @@
 from typing import *
+from array import array
+import warnings
 import re
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def preprocess_transactions(input_data : List[ List[ int ] ]) -> List[ List[ int ] ]:
 
     transactions = dict()
@@ -23,6 +30,321 @@ def load_file(filename : str) -> List[ List[ str ] ]:
 
         return file_data
 
+def parse_file_columns(filename : str) -> "np.ndarray":
+
+    """
+        Parse a file of three integer columns `customer tid item` straight into an int64 array of shape (rows, 3)
+        in a single vectorized pass (requires NumPy). Raises ValueError if the file is not purely numeric.
+    """
+
+    with open(filename, mode = "r", encoding = "utf-8") as rf:
+        text = rf.read()
+
+    # parsing stops with a warning at the first non-numeric token
+    with warnings.catch_warnings():
+
+        warnings.simplefilter("error")
+
+        try:
+            values = np.fromstring(text, dtype = np.int64, sep = " ")
+        except (DeprecationWarning, ValueError) as exception:
+            raise ValueError("{} is not a file of integer columns".format(filename)) from exception
+
+    if (values.size % 3):
+        raise ValueError("{} is not a file of three integer columns".format(filename))
+
+    return values.reshape(-1, 3)
+
+def group_transaction_columns(columns : "np.ndarray") -> Tuple[ "np.ndarray", "np.ndarray" ]:
+
+    """
+        Vectorized `preprocess_transactions`: group rows by their first column into CSR arrays, where the items of
+        transaction `t` are `items[offsets[t] : offsets[t + 1]]`. Transactions keep the order of first appearance
+        and items keep their row order, so the result matches `preprocess_transactions`.
+    """
+
+    (tids, items) = (columns[:, 0], columns[:, -1])
+
+    if (tids.size == 0):
+        return (np.zeros(1, dtype = np.int64), np.zeros(0, dtype = np.int64))
+
+    # transactions sorted by id (the usual case) need no reordering
+    if (np.all(tids[1:] >= tids[:-1])):
+
+        boundaries = np.flatnonzero(tids[1:] != tids[:-1]) + 1
+
+        offsets = np.concatenate(([ 0 ], boundaries, [ tids.size ])).astype(np.int64)
+
+        return (offsets, items.astype(np.int64))
+
+    # index of each transaction in order of first appearance
+    (_, first_rows, inverse) = np.unique(tids, return_index = True, return_inverse = True)
+
+    transaction_ranks = np.empty(first_rows.size, dtype = np.int64)
+
+    transaction_ranks[np.argsort(first_rows, kind = "stable")] = np.arange(first_rows.size)
+
+    row_transactions = transaction_ranks[inverse.reshape(-1)]
+
+    # stable sort keeps items of a transaction in row order
+    order = np.argsort(row_transactions, kind = "stable")
+
+    offsets = np.concatenate(([ 0 ], np.cumsum(np.bincount(row_transactions, minlength = first_rows.size)))).astype(np.int64)
+
+    return (offsets, items[order].astype(np.int64))
+
+def load_file_csr(filename : str) -> Tuple[ Sequence[ int ], Sequence[ int ] ]:
+
+    """
+        Load a `customer tid item` file of integers as CSR arrays (offsets, items), see `group_transaction_columns`.
+        Uses the vectorized NumPy parser when available, else falls back to streaming the rows.
+    """
+
+    if (np is not None):
+        return group_transaction_columns(parse_file_columns(filename))
+
+    # {  tid : [ item1, item2, ... ]  } in order of first appearance, as in `preprocess_transactions`
+    transactions = dict()
+
+    for tid, _, item in stream_file_rows(filename):
+        transactions.setdefault(int(tid), []).append(int(item))
+
+    (offsets, items) = (array('q', [ 0 ]), array('q'))
+
+    for transaction in transactions.values():
+
+        items.extend(transaction)
+
+        offsets.append(items.__len__())
+
+    return (offsets, items)
+
+def csr_to_transactions(offsets : Sequence[ int ], items : Sequence[ int ]) -> List[ List[ int ] ]:
+
+    """Weighted transactions [ 1, item1, item2, ... ] of CSR arrays (integer items would otherwise be taken for counts)."""
+
+    (offsets, items) = ((offsets.tolist(), items.tolist()) if (np is not None and isinstance(items, np.ndarray)) else (offsets, items))
+
+    return [  [ 1, *items[offsets[tid] : offsets[tid + 1]] ] for tid in range(offsets.__len__() - 1)  ]
+
+def stream_file_rows(filename : str, chunk_size : int = 1 << 20) -> Iterator[ List[ str ] ]:
+
+    """Tokens of each non-empty line of `filename`, read in chunks of `chunk_size` characters (same tokens as `load_file`)."""
+
+    with open(filename, mode = "r", encoding = "utf-8") as rf:
+
+        # incomplete last line of the previous chunk
+        partial_line = ""
+
+        while (True):
+
+            chunk = rf.read(chunk_size)
+
+            if (chunk == ""):
+                break
+
+            lines = (partial_line + chunk).split("\n")
+
+            partial_line = lines.pop()
+
+            for line in lines:
+
+                tokens = re.findall("[a-zA-Z0-9]+", line)
+
+                if (tokens.__len__()):
+                    yield tokens
+
+        tokens = re.findall("[a-zA-Z0-9]+", partial_line)
+
+        if (tokens.__len__()):
+            yield tokens
+
+def stream_transactions(filename         : str, 
+                        chunk_size       : int = 1 << 20, 
+                        max_transactions : Optional[ int ] = None) -> Iterator[ List[ str ] ]:
+
+    """
+        Transactions of a `customer tid item` file, one at a time: rows are grouped by their first column, as in
+        `preprocess_transactions` and `load_file_csr`, so only the current chunk and transaction are held in memory
+        whatever the file size. Rows must therefore be sorted by their first column (numerically for integer
+        keys, as written by the IBM generator), and ValueError is raised when a key comes back after a larger one.
+    """
+
+    (transaction, cur_key, num_transactions) = ([], None, 0)
+
+    for label, _, item in stream_file_rows(filename, chunk_size):
+
+        # integer keys are ordered numerically, others as strings after them
+        key = ((0, int(label), "") if (label.isdigit()) else (1, 0, label))
+
+        if (key != cur_key and transaction.__len__()):
+
+            if (key < cur_key):
+                raise ValueError("{} is not sorted by its first column (transaction {} is out of order)".format(filename, label))
+
+            # stop after `max_transactions` transactions
+            if (max_transactions is not None and num_transactions >= max_transactions):
+                return
+
+            yield transaction
+
+            (transaction, num_transactions) = ([], num_transactions + 1)
+
+        cur_key = key
+
+        transaction.append(item)
+
+    if (transaction.__len__() and (max_transactions is None or num_transactions < max_transactions)):
+        yield transaction
+
+class TransactionStream(object):
+
+    """Re-iterable view of the transactions of a file: every iteration streams the file again (see `stream_transactions`)."""
+
+    def __init__(self, filename : str, chunk_size : int = 1 << 20, max_transactions : Optional[ int ] = None) -> None:
+
+        (self.filename, self.chunk_size, self.max_transactions) = (filename, chunk_size, max_transactions)
+
+    def __iter__(self) -> Iterator[ List[ str ] ]:
+        return stream_transactions(self.filename, self.chunk_size, self.max_transactions)
+
+def materialize_transactions(transactions : Iterable[ List[ Union[ int, str ] ] ], 
+                             min_sup_int  : int) -> Tuple[ List[ List[ Union[ int, str ] ] ], Dict[ str, int ] ]:
+
+    """
+        Two passes over re-iterable transactions (e.g. a `TransactionStream`): the first counts item occurrences,
+        the second keeps only frequent items, sorted by occurrences, and merges identical rows. Returns the
+        unique weighted rows [ count, item1, item2, ... ], which every engine accepts, and the occurrences
+        of all items, so that only the filtered, compacted database is ever held in memory.
+    """
+
+    occurrences = count_transaction_items(transactions)
+
+    # {  (item1, item2, ...) : count  }
+    unique_rows = dict()
+
+    for transaction in transactions:
+
+        (weight, items) = ((transaction[0], transaction[1:]) if (isinstance(transaction[0], int)) else (1, transaction))
+
+        # frequent items in non-increasing order by occurrences
+        items = tuple(sorted(set(filter(lambda x : occurrences[x] >= min_sup_int, items)), key = lambda x : (-occurrences[x], x)))
+
+        if (items.__len__()):
+            unique_rows[items] = unique_rows.get(items, 0) + weight
+
+    return ([  [ weight, *items ] for items, weight in unique_rows.items()  ], occurrences)
+
+def count_transaction_items(transactions : List[ List[ Union[ int, str ] ] ]) -> Dict[ str, int ]:
+
+    # initialization of an empty dictionary to be used to count item occurrences
+    occurrences = dict()
+
+    for transaction in transactions:
+
+        # weighted transactions store their integer count in front [ count, item1, item2, ... ]
+        (weight, items) = ((transaction[0], transaction[1:]) if (isinstance(transaction[0], int)) else (1, transaction))
+
+        for item in items:
+            occurrences[item] = occurrences.get(item, 0) + weight
+
+    return occurrences
+
+def encode_transactions(transactions : List[ List[ Union[ int, str ] ] ]) -> Tuple[ List[ List[ int ] ], List[ str ] ]:
+
+    """
+        Map items to dense integer codes ranked by frequency (code 0 is the most frequent item). 
+        Encoded transactions are weighted [ count, code1, code2, ... ] with codes in ascending order,
+        which is also non-increasing order of occurrences. Returns the encoded transactions and the
+        list of item labels used to decode codes back (`item_labels[code]`).
+    """
+
+    # drop empty transactions since they carry no items to encode
+    transactions = [  transaction for transaction in transactions if (transaction.__len__())  ]
+
+    occurrences = count_transaction_items(transactions)
+
+    # most frequent items first, ties broken by label so that encoding is deterministic
+    item_labels = sorted(occurrences, key = lambda x : (-occurrences[x], x))
+
+    item_codes = {  label : code for code, label in enumerate(item_labels)  }
+
+    encoded = list()
+
+    for transaction in transactions:
+
+        (weight, items) = ((transaction[0], transaction[1:]) if (isinstance(transaction[0], int)) else (1, transaction))
+
+        encoded.append([ weight, *sorted(map(item_codes.__getitem__, items)) ])
+
+    return (encoded, item_labels)
+
+def compact_transactions(transactions : List[ List[ Union[ int, str ] ] ]) -> Tuple[ List[ List[ Union[ int, str ] ] ], float ]:
+
+    """
+        Hash filtered, sorted transactions into unique weighted rows [ count, item1, item2, ... ].
+        Identical rows are merged by adding up their counts and empty rows are dropped, since they
+        do not contribute to the support of any itemset. Returns the unique rows and the compaction
+        ratio (number of input rows per unique row).
+    """
+
+    # {  (item1, item2, ...) : count  }
+    unique_rows = dict()
+
+    for transaction in transactions:
+
+        (weight, items) = ((transaction[0], transaction[1:]) if (transaction.__len__() and isinstance(transaction[0], int)) else (1, transaction))
+
+        if (items.__len__() == 0):
+            continue
+
+        items = tuple(items)
+
+        unique_rows[items] = unique_rows.get(items, 0) + weight
+
+    compacted = [  [ weight, *items ] for items, weight in unique_rows.items()  ]
+
+    return (compacted, transactions.__len__() / max(compacted.__len__(), 1))
+
+def decode_itemset(itemset : Iterable[ int ], item_labels : List[ str ]) -> FrozenSet[ str ]:
+    return frozenset(map(item_labels.__getitem__, itemset))
+
+def decode_occurrences(occurrences : Dict[ int, int ], item_labels : List[ str ]) -> Dict[ str, int ]:
+    return {  item_labels[code] : count for code, count in occurrences.items()  }
+
+def decode_frequent_patterns(frequent_patterns : Dict[ FrozenSet[ int ], int ], 
+                             item_labels       : List[ str ]) -> Dict[ FrozenSet[ str ], int ]:
+
+    # `main.py` keys its patterns by tail item {  tail : {  prefix_path : support  }  }
+    if (any(not isinstance(itemset, frozenset) for itemset in frequent_patterns)):
+        return {  
+            item_labels[tail_item] : {  
+                tuple(map(item_labels.__getitem__, prefix_path)) : support for prefix_path, support in prefix_paths.items()  
+            } for tail_item, prefix_paths in frequent_patterns.items()  
+        }
+
+    return {  decode_itemset(itemset, item_labels) : support for itemset, support in frequent_patterns.items()  }
+
+def decode_association_rules(mined_rules : Set[ Tuple[ FrozenSet[ int ], FrozenSet[ int ], float, float, float ] ],
+                             item_labels : List[ str ]) -> Set[ Tuple[ FrozenSet[ str ], FrozenSet[ str ], float, float, float ] ]:
+
+    return {  
+        (decode_itemset(antecedent, item_labels), decode_itemset(consequent, item_labels), *measures) 
+            for antecedent, consequent, *measures in mined_rules  
+    }
+
+def mine_encoded_frequent_patterns(mine_frequent_patterns : Callable, 
+                                   transactions           : List[ List[ str ] ],
+                                   min_sup_int            : int) -> Tuple[ Dict[ FrozenSet[ str ], int ], Dict[ str, int ] ]:
+
+    """Run any `mine_frequent_patterns` engine on integer-encoded transactions and decode its output."""
+
+    (encoded, item_labels) = encode_transactions(transactions)
+
+    (frequent_patterns, occurrences) = mine_frequent_patterns(encoded, min_sup_int)
+
+    return (decode_frequent_patterns(frequent_patterns, item_labels), decode_occurrences(occurrences, item_labels))
+
 def post_process_mined_rules(occurrences : Dict[ str, int ],
                              mined_rules : Set[ Tuple[ FrozenSet[ Any ], FrozenSet[ Any ], float, int ] ],
                              min_conf_float : float,